@@ -0,0 +1 @@
+"""Benchmarks for the mock portal. Run each module with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,40 @@
+"""Synthetic datasets shared by the benchmarks."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+COURSES = ["FIT1043", "FIT1045", "FIT1047", "FIT1058", "FIT2004", "FIT2014", "FIT3031", "FIT3175"]
+SLOTS = ["Lecture 01", "Tutorial 01", "Laboratory 01", "Workshop 01", "PASS 02"]
+TIMES = ["09:00 am", "11:00 am", "01:00 pm", "03:00 pm", "05:30 pm"]
+STATUSES = ["pending", "pending", "submitted", "locked"]
+
+
+def build_payload(entries: int, per_day: int) -> Dict[str, object]:
+    days: List[Dict[str, object]] = []
+    for start in range(0, entries, per_day):
+        day_idx = len(days)
+        days.append(
+            {
+                "anchor": f"D{day_idx}",
+                "label": f"Day {day_idx}",
+                "entries": [
+                    {
+                        "session_id": str(600000 + i),
+                        "course_code": COURSES[i % len(COURSES)],
+                        "slot_label": SLOTS[i % len(SLOTS)],
+                        "time_label": TIMES[i % len(TIMES)],
+                        "status": STATUSES[i % len(STATUSES)],
+                        "code": f"C{i:05X}"[-5:],
+                    }
+                    for i in range(start, min(start + per_day, entries))
+                ],
+            }
+        )
+    return {"days": days}
+
+
+def write_dataset(path: Path, entries: int, per_day: int) -> None:
+    path.write_text(json.dumps(build_payload(entries, per_day)), encoding="utf-8")
@@ -0,0 +1,150 @@
+"""Reading the schedule: scraping the HTML pages vs the /mock/api/ JSON endpoints.
+
+An ``all`` pass fetches the course list and every entry with its status, the
+way the automation does, and parses the result on the client. The HTML path
+is AttendanceInfo.aspx plus Units.aspx; the API path is /mock/api/courses
+plus every page of /mock/api/entries. A ``day`` pass wants one day's entries:
+HTML still has to fetch Units.aspx and find that day's panel, while the API
+asks for ``?day=``. ``warm`` passes repeat with nothing changed. ``changed``
+passes submit one session first, so the server has to render or serialize
+again. Single-entry lookups compare Entry.aspx with /mock/api/entries/{id}.
+
+Usage::
+
+    python -m benchmarks.bench_api --entries 2000 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.server import create_app
+
+from ._dataset import write_dataset
+
+_COURSES = re.compile(r"<h1>Enrolled Courses</h1>\s*<div>\s*([^<]*?)\s*</div>")
+_ENTRY = re.compile(
+    r'<li class="[^"]*">(?:<a href="Entry\.aspx\?s=([^&"]+)&(?:amp;)?d=[^"]*"[^>]*>)?'
+    r'<img[^>]*>([^<]*)<span class="status-tag status-(\w+)">'
+)
+_ENTRY_STATUS = re.compile(r">Status: ([^<]*)<")
+DAY = "D10"
+
+
+def parse_units(html: str) -> List[Tuple[str, str, str, str, str]]:
+    entries = []
+    for session_id, text, status in _ENTRY.findall(html):
+        hour, meridiem, course_code, slot_label = text.split(" ", 3)
+        entries.append((session_id, course_code, slot_label, f"{hour} {meridiem}", status))
+    return entries
+
+
+async def scrape_html(client: TestClient) -> Tuple[int, int, int]:
+    """Returns (requests, bytes, entries) for one pass."""
+    info = await (await client.get("/student/AttendanceInfo.aspx")).read()
+    units = await (await client.get("/student/Units.aspx")).read()
+    courses = _COURSES.search(info.decode("utf-8"))
+    assert courses is not None and courses.group(1).split()
+    return 2, len(info) + len(units), len(parse_units(units.decode("utf-8")))
+
+
+async def scrape_html_day(client: TestClient) -> Tuple[int, int, int]:
+    units = (await (await client.get("/student/Units.aspx")).read()).decode("utf-8")
+    start = units.index(f'id="dayPanel_{DAY}"')
+    panel = units[start : units.index("</ul>", start)]
+    return 1, len(units), len(parse_units(panel))
+
+
+async def read_api(client: TestClient) -> Tuple[int, int, int]:
+    response = await client.get("/mock/api/courses")
+    size = len(await response.read())
+    assert (await response.json())["courses"]
+    requests, entries, cursor = 1, 0, None
+    while True:
+        params = {"limit": "1000"}
+        if cursor:
+            params["cursor"] = cursor
+        body = await (await client.get("/mock/api/entries", params=params)).read()
+        page = json.loads(body)
+        requests += 1
+        size += len(body)
+        entries += len(page["entries"])
+        cursor = page["next"]
+        if not cursor:
+            return requests, size, entries
+
+
+async def read_api_day(client: TestClient) -> Tuple[int, int, int]:
+    body = await (await client.get("/mock/api/entries", params={"day": DAY})).read()
+    return 1, len(body), len(json.loads(body)["entries"])
+
+
+async def run(path: Path, passes: int, lookups: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    app = create_app(path, codes_path=None, data_poll_interval=0)
+    async with TestClient(TestServer(app)) as client:
+        session_ids = [entry.session_id for entry in app["model"].store.entries()]
+        day_size = sum(len(day.entries) for day in app["model"].store.days if day.anchor == DAY)
+        tenant = app["tenants"].default
+        changes = 0
+        passes_by_name = (
+            ("html all", scrape_html, len(session_ids)),
+            ("api all", read_api, len(session_ids)),
+            ("html day", scrape_html_day, day_size),
+            ("api day", read_api_day, day_size),
+        )
+        for name, one_pass, expected in passes_by_name:
+            for mode in ("warm", "changed"):
+                await one_pass(client)
+                started = time.perf_counter()
+                for round_no in range(passes):
+                    if mode == "changed":
+                        found = app["model"].store.get(session_ids[changes % len(session_ids)])
+                        status = "pending" if tenant.status_of(found[1]) == "submitted" else "submitted"
+                        assert tenant.set_status(found[1].session_id, status)
+                        changes += 1
+                    requests, size, entries = await one_pass(client)
+                elapsed = time.perf_counter() - started
+                assert entries == expected, f"{name} saw {entries} of {expected} entries"
+                results[f"{name} {mode}"] = {"ms": elapsed / passes * 1000, "requests": requests, "bytes": size}
+        for name, url in (("html entry", "/student/Entry.aspx?s={}"), ("api entry", "/mock/api/entries/{}")):
+            started = time.perf_counter()
+            for round_no in range(lookups):
+                body = await (await client.get(url.format(session_ids[round_no * 7919 % len(session_ids)]))).read()
+                if name == "html entry":
+                    assert _ENTRY_STATUS.search(body.decode("utf-8"))
+                else:
+                    assert json.loads(body)["status"]
+            elapsed = time.perf_counter() - started
+            results[name] = {"ms": elapsed / lookups * 1000, "requests": 1, "bytes": len(body)}
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--passes", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    print(f"{'entries':>8} {'path':<16} {'ms/pass':>9} {'requests':>9} {'bytes':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        for entries in args.entries:
+            write_dataset(path, entries, args.per_day)
+            for name, row in asyncio.run(run(path, args.passes, args.lookups)).items():
+                print(f"{entries:>8} {name:<16} {row['ms']:>9.2f} {int(row['requests']):>9} {int(row['bytes']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Submitting every code: one Entry.aspx form POST each vs /mock/submit batches.
+
+Usage::
+
+    python -m benchmarks.bench_batch_submit --entries 5000 --batch 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.data_loader import load_model
+from src.server import create_app
+from src.tenants import TENANT_HEADER
+
+from ._dataset import write_dataset
+
+CODE_FIELD = "ctl00$ContentPlaceHolder1$txtAttendanceCode"
+
+
+async def form_posts(client: TestClient, items: List[Tuple[str, str, str]]) -> float:
+    started = time.perf_counter()
+    for session_id, anchor, code in items:
+        response = await client.post(
+            "/student/Entry.aspx",
+            params={"s": session_id, "d": anchor},
+            data={CODE_FIELD: code},
+            headers={TENANT_HEADER: "forms"},
+        )
+        await response.read()
+    return time.perf_counter() - started
+
+
+async def batches(client: TestClient, items: List[Tuple[str, str, str]], size: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(items), size):
+        pairs = [[session_id, code] for session_id, _, code in items[start : start + size]]
+        response = await client.post("/mock/submit", json=pairs, headers={TENANT_HEADER: "batch"})
+        await response.read()
+    return time.perf_counter() - started
+
+
+async def run(path: Path, batch: int) -> Tuple[float, float, int]:
+    model = load_model(path)
+    items = [(entry.session_id, day.anchor, entry.code) for day in model.days for entry in day.entries]
+    async with TestClient(TestServer(create_app(path, codes_path=None))) as client:
+        form_seconds = await form_posts(client, items)
+        batch_seconds = await batches(client, items, batch)
+    return form_seconds, batch_seconds, len(items)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, args.entries, args.per_day)
+        form_seconds, batch_seconds, count = asyncio.run(run(path, args.batch))
+
+    requests = -(-count // args.batch)
+    print(f"{count} submissions")
+    print(f"  form POSTs : {form_seconds * 1000:9.1f} ms  ({count} requests)")
+    print(f"  batches    : {batch_seconds * 1000:9.1f} ms  ({requests} requests, {form_seconds / batch_seconds:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
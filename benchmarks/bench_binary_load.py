@@ -0,0 +1,60 @@
+"""Dataset load time: JSON (eager and lazy) vs the binary format.
+
+Usage::
+
+    python -m benchmarks.bench_binary_load --entries 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.binary_format import convert
+from src.data_loader import load_model
+
+from ._dataset import write_dataset
+
+
+def timed_load(path: Path, repeat: int, **options: bool) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        model = load_model(path, **options)
+        best = min(best, time.perf_counter() - started)
+        del model
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "bench_units.json"
+        binary_path = Path(tmp) / "bench_units.bin"
+        write_dataset(json_path, args.entries, args.per_day)
+        convert(json_path, binary_path)
+        print(
+            f"{args.entries} entries: JSON {json_path.stat().st_size / 2**20:.1f} MiB,"
+            f" binary {binary_path.stat().st_size / 2**20:.1f} MiB"
+        )
+        eager = timed_load(json_path, args.repeat)
+        lazy = timed_load(json_path, args.repeat, lazy=True)
+        binary = timed_load(binary_path, args.repeat)
+
+    print(f"  JSON eager : {eager * 1000:8.1f} ms")
+    print(f"  JSON lazy  : {lazy * 1000:8.1f} ms")
+    print(f"  binary     : {binary * 1000:8.1f} ms  ({eager / binary:.0f}x faster than eager JSON)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Bytes per response and compression CPU for the Units and Entry pages.
+
+Fetches each page as identity, gzip and deflate, then times compressing the
+body on every request against the cached variant kept on the rendered page.
+
+Usage::
+
+    python -m benchmarks.bench_compression --entries 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import hdrs
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.compression import DYNAMIC_ENCODINGS, cached_compress, compress
+from src.server import create_app
+
+from ._dataset import write_dataset
+from .bench_micro import best_time
+
+
+async def fetch(path: Path, pages: Dict[str, str]) -> Dict[str, Dict[str, Tuple[int, bytes]]]:
+    """``{page: {encoding: (bytes on the wire, decoded body)}}``."""
+    results: Dict[str, Dict[str, Tuple[int, bytes]]] = {}
+    async with TestClient(TestServer(create_app(path, codes_path=None))) as client:
+        for name, url in pages.items():
+            results[name] = {}
+            for encoding in ("identity",) + DYNAMIC_ENCODINGS:
+                response = await client.get(url, headers={hdrs.ACCEPT_ENCODING: encoding})
+                body = await response.read()
+                results[name][encoding] = (response.content_length or len(body), body)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--min-seconds", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    pages = {"Units.aspx": "/student/Units.aspx", "Entry.aspx": "/student/Entry.aspx?s=600000&d=D0"}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, args.entries, args.per_day)
+        results = asyncio.run(fetch(path, pages))
+
+    print(f"{'page':<11} {'encoding':<9} {'bytes':>9} {'saved':>7} {'per-request ms':>15} {'cached ms':>10}")
+    for name, by_encoding in results.items():
+        size, body = by_encoding["identity"]
+        print(f"{name:<11} {'identity':<9} {size:>9}")
+        for encoding in DYNAMIC_ENCODINGS:
+            wire, decoded = by_encoding[encoding]
+            assert decoded == body, f"{name} {encoding} body differs"
+            variants: Dict[str, bytes] = {}
+            per_request = best_time(lambda: compress(body, encoding), args.min_seconds, 3)
+            cached = best_time(lambda: cached_compress(variants, body, encoding), args.min_seconds, 3)
+            print(
+                f"{'':<11} {encoding:<9} {wire:>9} {1 - wire / size:>6.0%}"
+                f" {per_request * 1000:>15.3f} {cached * 1000:>10.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
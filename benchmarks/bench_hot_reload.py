@@ -0,0 +1,86 @@
+"""Applying a one-entry dataset edit: full reload vs the watcher's incremental diff.
+
+Both parse the edited file. The full reload then installs it as a new model,
+which drops every tenant's statuses and re-renders every day panel; the
+incremental path diffs it by session id and keeps unchanged days' panels.
+
+Usage::
+
+    python -m benchmarks.bench_hot_reload --entries 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.data_loader import load_model
+from src.server import create_app, install_model, reload_model
+
+from ._dataset import write_dataset
+
+BASE_HREF = "http://127.0.0.1:8080/Student/Units.aspx"
+
+
+def edit(path: Path, round_no: int) -> None:
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    entries = payload["days"][len(payload["days"]) // 2]["entries"]
+    entries[0]["slot_label"] = f"Edited {round_no}"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def run(path: Path, mode: str, rounds: int, submitted: int) -> Dict[str, float]:
+    app = create_app(path, codes_path=None, data_poll_interval=0)
+    tenant = app["tenants"].default
+    session_ids = [entry.session_id for entry in app["model"].store.entries()]
+    for session_id in session_ids[:submitted]:
+        tenant.set_status(session_id, "submitted")
+    app["units_page"].render(BASE_HREF, tenant)
+    totals = {"parse_ms": 0.0, "apply_ms": 0.0, "render_ms": 0.0}
+    for round_no in range(rounds):
+        edit(path, round_no)
+        started = time.perf_counter()
+        loaded = load_model(path)
+        parsed = time.perf_counter()
+        if mode == "full":
+            install_model(app, loaded)
+        else:
+            asyncio.run(reload_model(app, loaded))
+        applied = time.perf_counter()
+        app["units_page"].render(BASE_HREF, app["tenants"].default)
+        rendered = time.perf_counter()
+        totals["parse_ms"] += (parsed - started) * 1000
+        totals["apply_ms"] += (applied - parsed) * 1000
+        totals["render_ms"] += (rendered - applied) * 1000
+    result = {name: value / rounds for name, value in totals.items()}
+    result["statuses_kept"] = len(app["tenants"].default.statuses)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--submitted", type=int, default=1000, help="Statuses changed before each edit")
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<12} {'parse ms':>9} {'apply ms':>9} {'render ms':>10} {'statuses kept':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        for mode in ("full", "incremental"):
+            write_dataset(path, args.entries, args.per_day)
+            row = run(path, mode, args.rounds, args.submitted)
+            print(
+                f"{mode:<12} {row['parse_ms']:>9.1f} {row['apply_ms']:>9.1f} {row['render_ms']:>10.1f}"
+                f" {int(row['statuses_kept']):>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Cost of re-rendering Units.aspx after one status flip, as the day count grows.
+
+Follows the server's path: the flip lands in a tenant's status overlay and
+the page is looked up in a :class:`PageCache` under the overlay's version.
+Compares a full rebuild of the render plan with the incremental path, and
+splits the latter into re-rendering the flipped entry's day panel and
+assembling the page (template join plus the cache's ETag hash).
+
+Only the panel step is incremental: it stays at a few microseconds from 10
+to 1000 days (2, 3.5 and 7 us measured, the growth being a copy of the
+panel list). Assembly copies and hashes the whole body, so it is linear in
+page size (about 60 us at 10 days, 0.65 ms at 100 and 6 ms at 1000) and
+makes up nearly all of the incremental total. A cache hit, when nothing
+changed, costs about 1 us at any size.
+
+Usage::
+
+    python -m benchmarks.bench_incremental_render --days 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import time
+from typing import Callable, List, Optional
+
+from src.data_loader import Day, Entry, Model, StatusOverlay, day_views
+from src.page_cache import PageCache
+from src.templates import UnitsPage
+
+from ._dataset import build_payload
+
+BASE_HREF = "http://127.0.0.1:8080/Student/Units.aspx"
+
+
+def build_model(days: int, per_day: int) -> Model:
+    payload = build_payload(days * per_day, per_day)
+    return Model(
+        days=[
+            Day(
+                anchor=day["anchor"],
+                label=day["label"],
+                entries=[Entry(**entry) for entry in day["entries"]],
+            )
+            for day in payload["days"]
+        ]
+    )
+
+
+def per_call_us(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--per-day", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'days':>6} {'page KiB':>9} {'full rebuild us':>16} {'incremental us':>15}"
+        f" {'panel us':>9} {'assembly us':>12} {'cache hit us':>13}"
+    )
+    for days in args.days:
+        model = build_model(days, args.per_day)
+        page = UnitsPage(day_views(model))
+        overlay = StatusOverlay(model)
+        cache = PageCache()
+        flips: List[str] = ["pending", "submitted"]
+        # Flip an entry in the middle day so neither end of the page is special.
+        session_id = model.days[days // 2].entries[0].session_id
+
+        def flip() -> None:
+            flips.reverse()
+            overlay.set_status(session_id, flips[0])
+
+        def lookup(units_page: UnitsPage) -> bytes:
+            key = ("units", "default", model.version, overlay.version, BASE_HREF)
+            return cache.get_or_render(key, lambda: units_page.render(BASE_HREF, overlay)).body
+
+        def full() -> None:
+            flip()
+            lookup(UnitsPage(day_views(model)))
+
+        def incremental() -> None:
+            flip()
+            lookup(page)
+
+        def panel() -> None:
+            # The per-flip work: drop and re-render the flipped panel only.
+            flip()
+            page._render_overlay_panels(overlay)
+
+        def assembly() -> None:
+            # Panels are cached here, so this is the join and the hash alone.
+            hashlib.blake2b(page.render(BASE_HREF, overlay), digest_size=12).digest()
+
+        timings = [per_call_us(step, args.repeat) for step in (full, incremental, panel, assembly)]
+        size = len(lookup(page))
+        hit = per_call_us(lambda: lookup(page), args.repeat)
+        print(
+            f"{days:>6} {size / 1024:>9.0f} {timings[0]:>16.1f} {timings[1]:>15.1f}"
+            f" {timings[2]:>9.1f} {timings[3]:>12.1f} {hit:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Time replaying a large status journal on startup.
+
+Usage::
+
+    python -m benchmarks.bench_journal_replay --events 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.data_loader import Day, Entry, Model
+from src.journal import Journal, collapse
+from src.tenants import TenantRegistry
+
+from ._dataset import build_payload
+
+STATUSES = (b"submitted", b"pending", b"locked")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--tenants", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    payload = build_payload(args.sessions, 40)
+    model = Model(
+        days=[
+            Day(anchor=day["anchor"], label=day["label"], entries=[Entry(**e) for e in day["entries"]])
+            for day in payload["days"]
+        ]
+    )
+    session_ids = [entry.session_id.encode() for entry in model.store.entries()]
+    tenants = [b"default"] + [f"worker-{idx}".encode() for idx in range(args.tenants - 1)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "journal.log"
+        path.write_bytes(
+            b"".join(
+                b"%s\t%s\t%s\n"
+                % (
+                    tenants[idx % len(tenants)],
+                    session_ids[(idx * 7919) % len(session_ids)],
+                    STATUSES[idx % len(STATUSES)],
+                )
+                for idx in range(args.events)
+            )
+        )
+        size = path.stat().st_size
+
+        started = time.perf_counter()
+        final = collapse(path.read_bytes())
+        collapsed = time.perf_counter() - started
+
+        registry = TenantRegistry(model, max_tenants=args.tenants + 1)
+        started = time.perf_counter()
+        applied = Journal(path).replay(registry)
+        replayed = time.perf_counter() - started
+
+    print(f"{args.events} events, {size / 2**20:.1f} MiB, {len(final)} final statuses")
+    print(f"  collapse : {collapsed * 1000:8.1f} ms")
+    print(f"  replay   : {replayed * 1000:8.1f} ms ({applied} applied)")
+
+
+if __name__ == "__main__":
+    main()
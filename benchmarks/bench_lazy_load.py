@@ -0,0 +1,95 @@
+"""Time-to-first-request and peak RSS for the eager, lazy and mmap loaders.
+
+Each mode runs in a fresh subprocess so peak RSS is measured in isolation.
+
+Usage::
+
+    python -m benchmarks.bench_lazy_load --entries 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ._dataset import write_dataset
+
+MODES: Dict[str, Dict[str, bool]] = {
+    "eager": {},
+    "lazy": {"lazy": True},
+    "mmap": {"use_mmap": True},
+}
+
+
+async def _first_requests(path: Path, mode: str) -> Dict[str, float]:
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from src.server import create_app
+
+    started = time.perf_counter()
+    app = create_app(path, **MODES[mode])
+    async with TestClient(TestServer(app)) as client:
+        first_id = app["model"].store.session_at(0)
+        response = await client.get(f"/student/Entry.aspx?s={first_id}")
+        await response.read()
+        entry_ready = time.perf_counter() - started
+        entry_rss = _peak_rss_mb()
+        response = await client.get("/student/Units.aspx")
+        await response.read()
+        units_ready = time.perf_counter() - started
+    return {"entry_s": entry_ready, "entry_rss_mb": entry_rss, "units_s": units_ready}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def _child(path: Path, mode: str) -> None:
+    result = asyncio.run(_first_requests(path, mode))
+    result["units_rss_mb"] = _peak_rss_mb()
+    print(json.dumps(result))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500_000)
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(Path(args.child[0]), args.child[1])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, args.entries, args.per_day)
+        print(f"{args.entries} entries, {path.stat().st_size / 2**20:.1f} MiB JSON")
+        print("Seconds from startup to the first response, and peak RSS (MiB) by then")
+        print(f"{'mode':>6} {'Entry.aspx s':>13} {'RSS':>7} {'Units.aspx s':>13} {'RSS':>7}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_lazy_load", "--child", str(path), mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:>6} {result['entry_s']:>13.2f} {result['entry_rss_mb']:>7.0f}"
+                f" {result['units_s']:>13.2f} {result['units_rss_mb']:>7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare retained memory of the dataclass and compact model modes.
+
+Usage::
+
+    python -m benchmarks.bench_memory --entries 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.data_loader import load_model
+
+from ._dataset import write_dataset
+
+def measure(path: Path, compact: bool) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    model = load_model(path, compact=compact)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del model
+    return {"retained_mb": retained / 2**20, "peak_mb": peak / 2**20, "load_s": elapsed}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--per-day", type=int, default=40)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, args.entries, args.per_day)
+        print(f"{args.entries} entries, {path.stat().st_size / 2**20:.1f} MiB JSON")
+        results = {mode: measure(path, mode == "compact") for mode in ("dataclass", "compact")}
+
+    for mode, stats in results.items():
+        print(
+            f"{mode:>10}: retained {stats['retained_mb']:8.1f} MiB"
+            f"  peak {stats['peak_mb']:8.1f} MiB  load {stats['load_s']:.2f}s"
+        )
+    ratio = results["compact"]["retained_mb"] / results["dataclass"]["retained_mb"]
+    print(f"compact retains {ratio:.0%} of the dataclass model")
+
+
+if __name__ == "__main__":
+    main()
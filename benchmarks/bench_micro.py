@@ -0,0 +1,89 @@
+"""Micro-benchmarks of load_model, day_groups and render_units_page by dataset size.
+
+Usage::
+
+    python -m benchmarks.bench_micro --sizes 100 1000 10000 --output micro.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.data_loader import day_groups, load_model
+from src.templates import render_units_page
+
+from ._dataset import write_dataset
+
+BASE_HREF = "http://127.0.0.1:8080/Student/Units.aspx"
+
+
+def best_time(fn: Callable[[], object], min_seconds: float, repeat: int) -> float:
+    """Best per-call time over ``repeat`` rounds of at least ``min_seconds`` each."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def measure(entries: int, per_day: int, min_seconds: float, repeat: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, entries, per_day)
+        results = {"load_model_ms": best_time(lambda: load_model(path), min_seconds, repeat)}
+        model = load_model(path)
+    groups = day_groups(model)
+    results["day_groups_ms"] = best_time(lambda: day_groups(model), min_seconds, repeat)
+    results["render_units_page_ms"] = best_time(
+        lambda: render_units_page(groups, base_href=BASE_HREF), min_seconds, repeat
+    )
+    return {name: seconds * 1000 for name, seconds in results.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Minimum duration of each timing round")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    rows = {}
+    print(f"{'entries':>8} {'load_model ms':>14} {'day_groups ms':>14} {'render ms':>10}")
+    for entries in args.sizes:
+        row = measure(entries, args.per_day, args.min_seconds, args.repeat)
+        rows[str(entries)] = row
+        print(
+            f"{entries:>8} {row['load_model_ms']:>14.3f} {row['day_groups_ms']:>14.3f}"
+            f" {row['render_units_page_ms']:>10.3f}"
+        )
+    if args.output is not None:
+        record = {
+            "benchmark": "micro",
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "config": {"per_day": args.per_day, "min_seconds": args.min_seconds, "repeat": args.repeat},
+            "sizes": rows,
+        }
+        args.output.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Latency of /mock/reset's state restore vs re-parsing the dataset.
+
+Usage::
+
+    python -m benchmarks.bench_reset --entries 100000 --changed 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.data_loader import load_model
+from src.tenants import TenantRegistry
+
+from ._dataset import write_dataset
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--changed", type=int, default=10_000, help="Statuses changed before each reset")
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, args.entries, 40)
+        started = time.perf_counter()
+        model = load_model(path)
+        reparse = time.perf_counter() - started
+
+    session_ids = [entry.session_id for entry in model.store.entries()][: args.changed]
+    registry = TenantRegistry(model, max_tenants=args.tenants + 1)
+    total = 0.0
+    for _ in range(args.repeat):
+        for idx in range(args.tenants):
+            overlay = registry.get(f"worker-{idx}")
+            for session_id in session_ids:
+                overlay.set_status(session_id, "submitted")
+        started = time.perf_counter()
+        registry.reset_all()
+        total += time.perf_counter() - started
+
+    print(f"{args.entries} entries, {args.changed} changed statuses x {args.tenants} tenants")
+    print(f"  re-parse JSON  : {reparse * 1e6:12.0f} us")
+    print(f"  baseline reset : {total / args.repeat * 1e6:12.1f} us")
+
+
+if __name__ == "__main__":
+    main()
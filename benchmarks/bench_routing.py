@@ -0,0 +1,131 @@
+"""Route resolution and base href cost: per-casing registrations vs the case-folded table.
+
+"duplicated" rebuilds the old layout, with every student page and static
+folder registered once for ``/student`` and once for ``/Student`` and the
+base href rewritten per request. "folded" is the app's router. Each
+resolves the same paths, including casings only the folded table serves.
+
+Usage::
+
+    python -m benchmarks.bench_routing --calls 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from src.routing import student_base_href
+from src.server import create_app
+
+from ._dataset import write_dataset
+
+PATHS = [
+    "/Student/Units.aspx",
+    "/student/Entry.aspx",
+    "/STUDENT/ATTENDANCEINFO.ASPX",
+    "/student/jqm/monash.min.css",
+    "/StUdEnT/img/nope.png",
+    "/mock/metrics",
+    "/missing",
+]
+HEADERS = {"Host": "127.0.0.1:8080"}
+
+
+def duplicated_router() -> web.UrlDispatcher:
+    async def handler(request: web.Request) -> web.StreamResponse:
+        return web.Response()
+
+    app = web.Application()
+    routes = [web.get("/", handler)]
+    for prefix in ("/student", "/Student"):
+        routes += [web.get(prefix + "/", handler), web.get(prefix, handler)]
+        for page in ("Units.aspx", "Entry.aspx", "AttendanceInfo.aspx", "Default.aspx"):
+            routes.append(web.get(f"{prefix}/{page}", handler))
+        routes.append(web.post(f"{prefix}/Entry.aspx", handler))
+    for folder in ("jq", "jqm", "img"):
+        for prefix in ("/student", "/Student"):
+            routes.append(web.get(f"{prefix}/{folder}/{{path:.+}}", handler))
+    routes += [
+        web.post("/mock/reset", handler),
+        web.post("/mock/submit", handler),
+        web.get("/mock/codes/{unit}/{week}", handler),
+        web.get("/mock/metrics", handler),
+        web.get("/static/{path:.*}", handler),
+    ]
+    app.add_routes(routes)
+    return app.router
+
+
+def rewritten_base_href(request: web.Request) -> str:
+    base_href = str(request.url.with_query(None))
+    if "/student/" in base_href:
+        base_href = base_href.replace("/student/", "/Student/", 1)
+    return base_href
+
+
+def time_resolve(router: web.UrlDispatcher, path: str, calls: int) -> float:
+    request = make_mocked_request("GET", path, headers=HEADERS)
+
+    async def loop() -> float:
+        started = time.perf_counter()
+        for _ in range(calls):
+            await router.resolve(request)
+        return time.perf_counter() - started
+
+    return asyncio.run(loop()) / calls
+
+
+def time_base_href(router: web.UrlDispatcher, path: str, fn: Callable[[web.Request], str], calls: int) -> float:
+    """Per-call cost of ``fn`` on fresh requests, so no per-request caching carries over."""
+    requests = [make_mocked_request("GET", path + "?s=1&d=D0", headers=HEADERS) for _ in range(calls)]
+
+    async def loop() -> float:
+        for request in requests:
+            request._match_info = await router.resolve(request)
+        started = time.perf_counter()
+        for request in requests:
+            fn(request)
+        return time.perf_counter() - started
+
+    return asyncio.run(loop()) / calls
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--href-calls", type=int, default=2_000, help="Fresh requests for the base href timing")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, 20, 20)
+        folded = create_app(path, codes_path=None).router
+    routers: Dict[str, web.UrlDispatcher] = {"duplicated": duplicated_router(), "folded": folded}
+    print(f"resources: duplicated {len(routers['duplicated'].resources())}, folded {len(folded.resources())}")
+
+    print(f"{'path':<32} {'duplicated us':>14} {'folded us':>10}  status (dup/folded)")
+    for route_path in PATHS:
+        row = {name: time_resolve(router, route_path, args.calls) for name, router in routers.items()}
+        statuses = []
+        for router in routers.values():
+            match = asyncio.run(router.resolve(make_mocked_request("GET", route_path, headers=HEADERS)))
+            statuses.append("404" if match.http_exception is not None else "200")
+        print(
+            f"{route_path:<32} {row['duplicated'] * 1e6:>14.2f} {row['folded'] * 1e6:>10.2f}  {'/'.join(statuses)}"
+        )
+
+    rewritten = time_base_href(routers["duplicated"], "/student/Entry.aspx", rewritten_base_href, args.href_calls)
+    cached = time_base_href(folded, "/student/Entry.aspx", student_base_href, args.href_calls)
+    print(f"base href per request: rewritten {rewritten * 1e6:.2f} us, cached per page {cached * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
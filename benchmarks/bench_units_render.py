@@ -0,0 +1,85 @@
+"""Units.aspx render throughput: the old f-string renderer vs the precompiled plan.
+
+The baseline is the renderer the server used before templates were
+precompiled, loaded from git history at ``BASELINE_REV`` (so this needs a
+git checkout). ``from scratch`` builds a new
+:class:`UnitsPage` per render, as after a reload; ``cached`` reuses a built
+plan and its rendered fragments, as between status changes.
+
+Usage::
+
+    python -m benchmarks.bench_units_render --entries 500 --seconds 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import tempfile
+import time
+import types
+from pathlib import Path
+from typing import Callable, Optional
+
+from src import PACKAGE_ROOT
+from src.data_loader import day_views, load_model
+from src.templates import UnitsPage
+
+from ._dataset import write_dataset
+
+BASE_HREF = "http://127.0.0.1:8080/Student/Units.aspx"
+# Last commit before templates were precompiled.
+BASELINE_REV = "f3b793a90e55dabaebc4d54e152e230627a9509a"
+
+
+def load_baseline() -> Callable[..., str]:
+    """``render_units_page`` from ``src/templates.py`` as of ``BASELINE_REV``."""
+    source = subprocess.run(
+        ["git", "show", f"{BASELINE_REV}:src/templates.py"],
+        cwd=PACKAGE_ROOT.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    module = types.ModuleType("baseline_templates")
+    exec(compile(source, f"{BASELINE_REV[:7]}:src/templates.py", "exec"), module.__dict__)
+    return module.render_units_page
+
+
+def rate(fn: Callable[[], object], seconds: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        count += 1
+    return count / seconds
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_units.json"
+        write_dataset(path, args.entries, args.per_day)
+        model = load_model(path)
+
+    render_legacy = load_baseline()
+    groups = day_views(model)
+    page = UnitsPage(groups)
+    assert page.render(BASE_HREF) == render_legacy(groups, base_href=BASE_HREF).encode("utf-8")
+
+    baseline = rate(lambda: render_legacy(groups, base_href=BASE_HREF).encode("utf-8"), args.seconds)
+    from_scratch = rate(lambda: UnitsPage(groups).render(BASE_HREF), args.seconds)
+    cached = rate(lambda: page.render(BASE_HREF), args.seconds)
+    print(f"{args.entries} entries")
+    print(f"  f-string baseline : {baseline:10.0f} renders/s")
+    print(f"  from scratch      : {from_scratch:10.0f} renders/s  ({from_scratch / baseline:.1f}x)")
+    print(f"  cached plan       : {cached:10.0f} renders/s  ({cached / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
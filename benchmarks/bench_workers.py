@@ -0,0 +1,99 @@
+"""Units.aspx throughput of one server process vs ``--workers N``.
+
+Starts ``python -m src.server`` as a subprocess for each worker count and
+drives it from several client processes, each running concurrent aiohttp
+requests.
+
+Usage::
+
+    python -m benchmarks.bench_workers --workers 1 4 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import aiohttp
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _drive(url: str, concurrency: int, seconds: float) -> int:
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def loop(session: aiohttp.ClientSession) -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            async with session.get(url) as response:
+                await response.read()
+            done += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(loop(session) for _ in range(concurrency)))
+    return done
+
+
+def _client(url: str, concurrency: int, seconds: float) -> int:
+    return asyncio.run(_drive(url, concurrency, seconds))
+
+
+def wait_ready(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), 0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run(workers: int, clients: int, concurrency: int, seconds: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/student/Units.aspx"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--port", str(port), "--workers", str(workers)],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        time.sleep(0.5)
+        with multiprocessing.Pool(clients) as pool:
+            counts = pool.starmap(_client, [(url, concurrency, seconds)] * clients)
+    finally:
+        server.terminate()
+        server.wait()
+    return sum(counts) / seconds
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, max(2, (os.cpu_count() or 2) // 2)])
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight requests per client process")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    for workers in args.workers:
+        rps = run(workers, args.clients, args.concurrency, args.seconds)
+        baseline = baseline or rps
+        print(f"workers={workers:<3} {rps:10.0f} req/s  ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Load test of the portal's hot endpoints with a weighted request mix.
+
+Runs ``create_app`` in-process on a free port, or drives an existing server
+with ``--url``. Each virtual user loops over a seeded, weighted mix of
+Units.aspx GETs, Entry.aspx GETs and POSTs and resets, by default under its
+own ``X-Mock-Student`` tenant. Prints throughput, latency percentiles and
+errors per operation and can write them as JSON for comparing runs.
+
+Usage::
+
+    python -m benchmarks.loadtest --entries 2000 --concurrency 32 --seconds 10 --output run.json
+    python -m benchmarks.loadtest --url http://127.0.0.1:8080 --data mock_units.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import socket
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from src.data_loader import load_model
+from src.generator import generate, parse_mix
+from src.server import create_app
+from src.tenants import TENANT_HEADER
+
+CODE_FIELD = "ctl00$ContentPlaceHolder1$txtAttendanceCode"
+DEFAULT_MIX = "units=45,entry_get=35,entry_post=18,reset=2"
+_ENTRY_LINK = re.compile(r'Entry\.aspx\?s=([^&"]+)&(?:amp;)?d=([^"&]+)')
+
+Session = Tuple[str, str, str]
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile.
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput": len(ordered) / seconds if seconds else 0.0,
+        "mean_ms": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50_ms": 1000 * percentile(ordered, 50),
+        "p95_ms": 1000 * percentile(ordered, 95),
+        "p99_ms": 1000 * percentile(ordered, 99),
+        "max_ms": 1000 * ordered[-1] if ordered else 0.0,
+    }
+
+
+def sessions_from_dataset(path: Path) -> List[Session]:
+    """``(session_id, day_anchor, code)`` for every entry of a dataset file."""
+    model = load_model(path)
+    return [(entry.session_id, day.anchor, entry.code) for day in model.days for entry in day.entries]
+
+
+async def sessions_from_units_page(session: aiohttp.ClientSession, base: str) -> List[Session]:
+    """Scrape session links from Units.aspx; codes are unknown, so POSTs will be rejected."""
+    async with session.get(f"{base}/student/Units.aspx") as response:
+        text = await response.text()
+    return [(session_id, anchor, "") for session_id, anchor in _ENTRY_LINK.findall(text)]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def in_process_server(data: Path, codes: Optional[Path], max_tenants: int) -> AsyncIterator[str]:
+    app = create_app(data, codes_path=codes, max_tenants=max_tenants)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+class LoadTest:
+    def __init__(
+        self,
+        base: str,
+        sessions: List[Session],
+        mix: Dict[str, float],
+        *,
+        concurrency: int,
+        seconds: float,
+        seed: int,
+        shared_tenant: bool,
+    ) -> None:
+        self.base = base
+        self.sessions = sessions
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.concurrency = concurrency
+        self.seconds = seconds
+        self.seed = seed
+        self.shared_tenant = shared_tenant
+        self.latencies: Dict[str, List[float]] = {op: [] for op in self.operations}
+        self.errors: Dict[str, int] = {op: 0 for op in self.operations}
+        self.error_samples: List[str] = []
+
+    async def _request(self, http: aiohttp.ClientSession, op: str, tenant: str, rng: random.Random) -> None:
+        session_id, anchor, code = rng.choice(self.sessions)
+        headers = {} if self.shared_tenant else {TENANT_HEADER: tenant}
+        if op == "units":
+            request = http.get(f"{self.base}/student/Units.aspx", headers=headers)
+        elif op == "entry_get":
+            request = http.get(f"{self.base}/student/Entry.aspx", params={"s": session_id, "d": anchor}, headers=headers)
+        elif op == "entry_post":
+            request = http.post(
+                f"{self.base}/student/Entry.aspx",
+                params={"s": session_id, "d": anchor},
+                data={CODE_FIELD: code if rng.random() < 0.9 else "WRONG"},
+                headers=headers,
+            )
+        elif op == "reset":
+            params = {} if self.shared_tenant else {"tenant": tenant}
+            request = http.post(f"{self.base}/mock/reset", params=params)
+        else:
+            raise ValueError(f"Unknown operation {op!r}")
+        started = time.perf_counter()
+        try:
+            async with request as response:
+                await response.read()
+                failed = response.status >= 400
+                reason = f"{op}: HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            failed, reason = True, f"{op}: {exc!r}"
+        self.latencies[op].append(time.perf_counter() - started)
+        if failed:
+            self.errors[op] += 1
+            if len(self.error_samples) < 10:
+                self.error_samples.append(reason)
+
+    async def _user(self, http: aiohttp.ClientSession, index: int, deadline: float) -> None:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        tenant = f"load-{index}"
+        while time.perf_counter() < deadline:
+            op = rng.choices(self.operations, self.weights)[0]
+            await self._request(http, op, tenant, rng)
+
+    async def run(self) -> Dict[str, object]:
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            started = time.perf_counter()
+            deadline = started + self.seconds
+            await asyncio.gather(*(self._user(http, idx, deadline) for idx in range(self.concurrency)))
+            elapsed = time.perf_counter() - started
+        operations = {op: summarize(self.latencies[op], self.errors[op], elapsed) for op in self.operations}
+        total = summarize(
+            [latency for values in self.latencies.values() for latency in values],
+            sum(self.errors.values()),
+            elapsed,
+        )
+        return {"elapsed_s": elapsed, "total": total, "operations": operations, "error_samples": self.error_samples}
+
+
+def print_report(result: Dict[str, object]) -> None:
+    rows = dict(result["operations"])  # type: ignore[arg-type]
+    rows["total"] = result["total"]
+    print(f"{'operation':<12} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, row in rows.items():
+        print(
+            f"{name:<12} {row['requests']:>9} {row['throughput']:>9.0f} {row['p50_ms']:>8.2f}"
+            f" {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>7}"
+        )
+    for sample in result["error_samples"]:  # type: ignore[union-attr]
+        print(f"  error: {sample}")
+
+
+async def run_load_test(args: argparse.Namespace, mix: Dict[str, float]) -> Dict[str, object]:
+    async def drive(base: str, sessions: List[Session]) -> Dict[str, object]:
+        if not sessions:
+            async with aiohttp.ClientSession() as http:
+                sessions = await sessions_from_units_page(http, base)
+        if not sessions:
+            raise SystemExit(f"No sessions found at {base}")
+        test = LoadTest(
+            base,
+            sessions,
+            mix,
+            concurrency=args.concurrency,
+            seconds=args.seconds,
+            seed=args.seed,
+            shared_tenant=args.shared_tenant,
+        )
+        return await test.run()
+
+    if args.url:
+        sessions = sessions_from_dataset(args.data) if args.data else []
+        return await drive(args.url.rstrip("/"), sessions)
+    with tempfile.TemporaryDirectory() as tmp:
+        data, codes = args.data, None
+        if data is None:
+            data, codes = Path(tmp) / "units.json", Path(tmp) / "data"
+            days = max(1, -(-args.entries // args.per_day))
+            generate(data, codes, days=days, sessions_per_day=args.per_day, seed=args.seed)
+        async with in_process_server(data, codes, max(1024, args.concurrency + 1)) as base:
+            return await drive(base, sessions_from_dataset(data))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: start one in-process)")
+    parser.add_argument("--data", type=Path, default=None, help="Dataset to serve, or to read sessions and codes from")
+    parser.add_argument("--entries", type=int, default=1000, help="Generated entries when --data is not given")
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=16, help="Virtual users")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shared-tenant", action="store_true", help="Send every user's requests as the default tenant")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_load_test(args, args.mix))
+    print_report(result)
+    if args.output is not None:
+        config = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+        record = {"benchmark": "loadtest", "timestamp": time.time(), "python": sys.version.split()[0], "config": config}
+        record.update(result)
+        args.output.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
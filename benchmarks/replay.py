@@ -0,0 +1,197 @@
+"""Replay traffic recorded with ``--record`` against a server.
+
+The log is streamed, never loaded whole. Requests are sent at their
+recorded spacing divided by ``--speed``, or back to back with
+``--speed max``. At most ``--concurrency`` are in flight. When that cap
+holds a request back past its scheduled time, the delay is reported as lag
+rather than hidden. Prints latency percentiles per route and can write them
+as JSON like ``benchmarks.loadtest``.
+
+Usage::
+
+    python -m src.server --record traffic.jsonl          # capture
+    python -m benchmarks.replay traffic.jsonl --url http://127.0.0.1:8080 --speed 4
+    python -m benchmarks.replay traffic.jsonl --data mock_units.json --speed max --concurrency 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import aiohttp
+
+from src.tenants import TENANT_HEADER
+
+from .loadtest import in_process_server, summarize
+
+
+def parse_speed(value: str) -> Optional[float]:
+    """``max`` for no pacing, otherwise a positive multiple of recorded time."""
+    if value.lower() == "max":
+        return None
+    speed = float(value.rstrip("xX"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def read_log(path: Path) -> Iterator[Dict[str, object]]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def route_label(record: Dict[str, object]) -> str:
+    path = str(record["p"])
+    if path.lower().startswith(("/student/jq/", "/student/jqm/", "/student/img/", "/static/")):
+        path = path.rsplit("/", 1)[0] + "/*"
+    return f"{record['m']} {path}"
+
+
+class Replay:
+    def __init__(self, base: str, *, speed: Optional[float], concurrency: int, limit: Optional[int]) -> None:
+        self.base = base
+        self.speed = speed
+        self.concurrency = concurrency
+        self.limit = limit
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_samples: List[str] = []
+        self.max_lag = 0.0
+
+    async def _send(self, http: aiohttp.ClientSession, record: Dict[str, object], label: str) -> None:
+        url = self.base + str(record["p"])
+        if record.get("q"):
+            url += "?" + str(record["q"])
+        headers = {TENANT_HEADER: str(record["k"])} if record.get("k") else {}
+        data: Optional[object] = None
+        if "f" in record:
+            data = [tuple(pair) for pair in record["f"]]  # type: ignore[union-attr]
+        elif "b" in record:
+            data = str(record["b"]).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        try:
+            async with http.request(str(record["m"]), url, data=data, headers=headers, allow_redirects=False) as response:
+                await response.read()
+                failed = response.status >= 400
+                reason = f"{label}: HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            failed, reason = True, f"{label}: {exc!r}"
+        self.latencies.setdefault(label, []).append(time.perf_counter() - started)
+        if failed:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            if len(self.error_samples) < 10:
+                self.error_samples.append(reason)
+
+    async def run(self, records: Iterator[Dict[str, object]]) -> Dict[str, object]:
+        slots = asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async def send(http: aiohttp.ClientSession, record: Dict[str, object], label: str) -> None:
+            try:
+                await self._send(http, record, label)
+            finally:
+                slots.release()
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            started = time.perf_counter()
+            first_t: Optional[float] = None
+            for count, record in enumerate(records):
+                if self.limit is not None and count >= self.limit:
+                    break
+                if self.speed is not None:
+                    t = float(record["t"])  # type: ignore[arg-type]
+                    first_t = t if first_t is None else first_t
+                    due = started + (t - first_t) / self.speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await slots.acquire()
+                if self.speed is not None:
+                    self.max_lag = max(self.max_lag, time.perf_counter() - due)
+                task = asyncio.ensure_future(send(http, record, route_label(record)))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+            elapsed = time.perf_counter() - started
+        operations = {
+            label: summarize(values, self.errors.get(label, 0), elapsed)
+            for label, values in sorted(self.latencies.items())
+        }
+        total = summarize(
+            [latency for values in self.latencies.values() for latency in values],
+            sum(self.errors.values()),
+            elapsed,
+        )
+        return {
+            "elapsed_s": elapsed,
+            "max_lag_ms": self.max_lag * 1000,
+            "total": total,
+            "operations": operations,
+            "error_samples": self.error_samples,
+        }
+
+
+def print_report(result: Dict[str, object]) -> None:
+    rows = dict(result["operations"])  # type: ignore[arg-type]
+    rows["total"] = result["total"]
+    width = max(len(name) for name in rows)
+    print(f"{'route':<{width}} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, row in rows.items():
+        print(
+            f"{name:<{width}} {row['requests']:>9} {row['throughput']:>9.0f} {row['p50_ms']:>8.2f}"
+            f" {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>7}"
+        )
+    for sample in result["error_samples"]:  # type: ignore[union-attr]
+        print(f"  error: {sample}")
+
+
+async def replay(args: argparse.Namespace) -> Dict[str, object]:
+    async def drive(base: str) -> Dict[str, object]:
+        test = Replay(base, speed=args.speed, concurrency=args.concurrency, limit=args.limit)
+        return await test.run(read_log(args.log))
+
+    if args.url:
+        return await drive(args.url.rstrip("/"))
+    if args.data is None:
+        raise SystemExit("Pass --url of a running server or --data to serve in-process")
+    async with in_process_server(args.data, args.codes, 1024) as base:
+        return await drive(base)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", type=Path, help="JSONL file written by --record")
+    parser.add_argument("--url", default=None, help="Base URL of a running server")
+    parser.add_argument("--data", type=Path, default=None, help="Dataset to serve in-process instead of --url")
+    parser.add_argument("--codes", type=Path, default=None, help="Codes tree for the in-process server")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1 (recorded pace), N (N times faster) or max")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at most")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N requests")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(replay(args))
+    print_report(result)
+    print(f"elapsed {result['elapsed_s']:.2f} s, max lag behind schedule {result['max_lag_ms']:.1f} ms")
+    if args.output is not None:
+        config = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+        record = {"benchmark": "replay", "timestamp": time.time(), "python": sys.version.split()[0], "config": config}
+        record.update(result)
+        args.output.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Serialized JSON views of a model for the ``/mock/api/`` endpoints.
+
+An :class:`ApiIndex` belongs to one model and is replaced with it. It
+serializes each entry's JSON object once, up to its status, which is spliced
+in per tenant, so a page of entries is a join of cached byte strings. Lists
+are paginated with opaque cursors naming the last item returned. A cursor
+keeps working across status changes, and across reloads as long as that item
+still exists.
+"""
+
+from __future__ import annotations
+
+import base64
+import collections.abc
+import json
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .data_loader import Day, Entry, Model, StatusOverlay
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_Item = Tuple[Day, Entry]
+
+
+class StaleCursor(ValueError):
+    """The item a cursor points after is no longer in the list."""
+
+
+def encode_cursor(position: int, key: str) -> str:
+    return base64.urlsafe_b64encode(f"{position}:{key}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        position, separator, key = raw.partition(":")
+        if not separator:
+            raise ValueError
+        return int(position), key
+    except ValueError:
+        # binascii.Error and UnicodeDecodeError are ValueErrors too.
+        raise ValueError("Malformed cursor") from None
+
+
+def page_size(value: Optional[str]) -> int:
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return size
+
+
+def _resume(items: Sequence, cursor: Optional[str], key_of: Callable[[object], str]) -> int:
+    """Index of the first item after ``cursor`` in ``items``."""
+    if not cursor:
+        return 0
+    position, key = decode_cursor(cursor)
+    if 0 < position <= len(items) and key_of(items[position - 1]) == key:
+        return position
+    # The list changed under the cursor; find its item wherever it went.
+    for index, item in enumerate(items):
+        if key_of(item) == key:
+            return index + 1
+    raise StaleCursor("Cursor no longer matches the dataset; start again without it")
+
+
+def _page(name: bytes, parts: List[bytes], next_cursor: Optional[str]) -> bytes:
+    return b'{"%s":[%s],"next":%s}' % (name, b",".join(parts), _encode(next_cursor).encode("utf-8"))
+
+
+class _AllEntries(collections.abc.Sequence):
+    """Every unique entry in the store's dense order, built only as read."""
+
+    def __init__(self, model: Model) -> None:
+        self.store = model.store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index: int) -> _Item:  # type: ignore[override]
+        found = self.store.get(self.store.session_at(index))
+        assert found is not None
+        return found
+
+
+class ApiIndex:
+    def __init__(self, model: Model) -> None:
+        self.model = model
+        self._entries: Dict[Tuple[str, str], bytes] = {}
+        self._statuses: Dict[str, bytes] = {}
+        self._days: Optional[List[bytes]] = None
+        self._courses: Optional[bytes] = None
+        self._course_codes = frozenset(model.store.course_codes())
+        self._anchors: Optional[Dict[str, List[Day]]] = None
+        self._lists: Dict[Tuple[Optional[str], Optional[str]], Sequence[_Item]] = {}
+
+    def _entry_head(self, day: Day, entry: Entry) -> bytes:
+        """The entry's JSON object up to and including ``"status":``."""
+        key = (day.anchor, entry.session_id)
+        head = self._entries.get(key)
+        if head is None:
+            body = _encode(
+                {
+                    "session_id": entry.session_id,
+                    "course_code": entry.course_code,
+                    "slot_label": entry.slot_label,
+                    "time_label": entry.time_label,
+                    "day": day.anchor,
+                }
+            )
+            head = self._entries[key] = (body[:-1] + ',"status":').encode("utf-8")
+        return head
+
+    def _status_tail(self, status: str) -> bytes:
+        tail = self._statuses.get(status)
+        if tail is None:
+            tail = self._statuses[status] = (_encode(status) + "}").encode("utf-8")
+        return tail
+
+    def _entry_json(self, day: Day, entry: Entry, overlay: StatusOverlay) -> bytes:
+        return self._entry_head(day, entry) + self._status_tail(overlay.status_of(entry))
+
+    def courses(self) -> bytes:
+        if self._courses is None:
+            self._courses = _encode({"courses": self.model.store.course_codes()}).encode("utf-8")
+        return self._courses
+
+    def has_day(self, anchor: str) -> bool:
+        if self._anchors is None:
+            self._anchors = {}
+            for day in self.model.store.days:
+                self._anchors.setdefault(day.anchor, []).append(day)
+        return anchor in self._anchors
+
+    def has_course(self, course_code: str) -> bool:
+        return course_code in self._course_codes
+
+    def days(self, *, cursor: Optional[str], limit: int) -> bytes:
+        days = self.model.store.days
+        if self._days is None:
+            self._days = []
+            for day in days:
+                # Deferred days know their size without being parsed.
+                size = len(day.session_ids) if not getattr(day, "loaded", True) else len(day.entries)  # type: ignore[attr-defined]
+                record = {"anchor": day.anchor, "label": day.label, "week": getattr(day, "week", None), "entries": size}
+                self._days.append(_encode(record).encode("utf-8"))
+        start = _resume(days, cursor, lambda day: day.anchor)
+        end = min(start + limit, len(days))
+        next_cursor = encode_cursor(end, days[end - 1].anchor) if end < len(days) else None
+        return _page(b"days", self._days[start:end], next_cursor)
+
+    def _listing(self, day: Optional[str], course: Optional[str]) -> Sequence[_Item]:
+        key = (day, course)
+        items = self._lists.get(key)
+        if items is None:
+            store = self.model.store
+            if day is not None:
+                self.has_day(day)
+                assert self._anchors is not None
+                items = [(found, entry) for found in self._anchors.get(day, ()) for entry in found.entries]
+                if course is not None:
+                    items = [item for item in items if item[1].course_code == course]
+            elif course is not None:
+                items = []
+                for entry in store.by_course(course):
+                    found = store.get(entry.session_id)
+                    assert found is not None
+                    items.append((found[0], entry))
+            else:
+                items = _AllEntries(self.model)
+            self._lists[key] = items
+        return items
+
+    def entries(
+        self,
+        overlay: StatusOverlay,
+        *,
+        day: Optional[str] = None,
+        course: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> bytes:
+        """One page of entries with ``overlay``'s statuses, optionally of one day and/or course."""
+        items = self._listing(day, course)
+        if cursor and day is None and course is None:
+            # Unfiltered listings follow the store's dense index, so resume in O(1).
+            _, session_id = decode_cursor(cursor)
+            index = self.model.store.index_of(session_id)
+            if index is None:
+                raise StaleCursor("Cursor no longer matches the dataset; start again without it")
+            start = index + 1
+        else:
+            start = _resume(items, cursor, lambda item: item[1].session_id)
+        end = min(start + limit, len(items))
+        parts = []
+        for index in range(start, end):
+            found, entry = items[index]
+            parts.append(self._entry_json(found, entry, overlay))
+        next_cursor = encode_cursor(end, items[end - 1][1].session_id) if end < len(items) else None
+        return _page(b"entries", parts, next_cursor)
+
+    def entry(self, overlay: StatusOverlay, session_id: str) -> Optional[bytes]:
+        found = self.model.store.get(session_id)
+        if found is None:
+            return None
+        return self._entry_json(found[0], found[1], overlay)
@@ -0,0 +1,230 @@
+"""Compact binary dataset format, loadable through ``mmap``.
+
+Layout (all integers little-endian)::
+
+    header        MAGIC, format version, day/entry/status-name counts and
+                  the offset of every section below
+    strings       UTF-8 strings joined with NUL, deduplicated
+    days          7 x uint32 per day: anchor, label, week (NO_WEEK if unset),
+                  first entry, entry count, first course, course count
+    day courses   uint32 string index per distinct course code of each day
+    entries       5 x uint32 per entry: session_id, course_code, slot_label,
+                  time_label, code (all string indexes)
+    status names  uint32 string index per status code
+    statuses      one status code byte per entry
+
+Loading decodes the string table in one call and slices the fixed-width
+columns; entries are only built when their day is first accessed.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from .data_loader import CompactEntry, Day, Entry, Model, day_week
+from .lazy_loader import LazyDay
+
+MAGIC = b"APLUSMB1"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<8sIIIIIQQQQQQQ")
+_DAY_FIELDS = 7
+NO_WEEK = 0xFFFFFFFF
+_ENTRY_FIELDS = 5
+
+
+def is_binary(path: Path) -> bool:
+    with open(path, "rb") as handle:
+        return handle.read(len(MAGIC)) == MAGIC
+
+
+def _u32(values: Sequence[int]) -> bytes:
+    table = array("I", values)
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table.tobytes()
+
+
+def _pad(size: int) -> bytes:
+    return b"\0" * (-size % 8)
+
+
+def convert(source: Path, target: Path) -> Tuple[int, int]:
+    """Write the JSON dataset at ``source`` to ``target``; returns ``(days, entries)``."""
+    payload = json.loads(source.read_text(encoding="utf-8"))
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if "\0" in value:
+            raise ValueError(f"NUL characters cannot be stored: {value!r}")
+        return strings.setdefault(value, len(strings))
+
+    status_names: Dict[str, int] = {}
+    day_table: List[int] = []
+    course_table: List[int] = []
+    entry_table: List[int] = []
+    status_column = bytearray()
+    for day in payload.get("days", []):
+        entries = day.get("entries", [])
+        courses = list(dict.fromkeys(intern(e["course_code"]) for e in entries))
+        week = day_week(day)
+        day_table += (
+            intern(day["anchor"]),
+            intern(day["label"]),
+            NO_WEEK if week is None else intern(week),
+            len(status_column),
+            len(entries),
+            len(course_table),
+            len(courses),
+        )
+        course_table += courses
+        for e in entries:
+            entry_table += (
+                intern(e["session_id"]),
+                intern(e["course_code"]),
+                intern(e["slot_label"]),
+                intern(e["time_label"]),
+                intern(e.get("code", "")),
+            )
+            status = e.get("status", "pending")
+            status_column.append(status_names.setdefault(status, len(status_names)))
+    if len(status_names) > 256:
+        raise ValueError("at most 256 distinct statuses are supported")
+
+    status_name_table = _u32([intern(name) for name in status_names])
+    blob = "\0".join(strings).encode("utf-8")
+    sections = [
+        blob + _pad(len(blob)),
+        _u32(day_table),
+        _u32(course_table),
+        _u32(entry_table),
+        status_name_table,
+        bytes(status_column),
+    ]
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(day_table) // _DAY_FIELDS,
+        len(status_column),
+        len(course_table),
+        len(status_names),
+        len(blob),
+        *offsets,
+    )
+    # A server may have the old file mapped; truncating it in place would
+    # fault its reads, so the new file replaces it under a fresh inode.
+    tmp_path = target.with_name(target.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(header)
+            for section in sections:
+                handle.write(section)
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return len(day_table) // _DAY_FIELDS, len(status_column)
+
+
+class BinarySource:
+    """Column views over a memory-mapped binary dataset."""
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        (
+            magic,
+            version,
+            self.day_count,
+            self.entry_count,
+            course_count,
+            status_count,
+            blob_size,
+            strings_at,
+            days_at,
+            courses_at,
+            entries_at,
+            names_at,
+            statuses_at,
+        ) = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} binary dataset")
+        self.strings: List[str] = str(view[strings_at : strings_at + blob_size], "utf-8").split("\0")
+        self.days = self._u32_view(view, days_at, self.day_count * _DAY_FIELDS)
+        self.day_courses = self._u32_view(view, courses_at, course_count)
+        self.entries = self._u32_view(view, entries_at, self.entry_count * _ENTRY_FIELDS)
+        names = self._u32_view(view, names_at, status_count)
+        self.status_names = [self.strings[idx] for idx in names]
+        self.statuses = view[statuses_at : statuses_at + self.entry_count]
+
+    @staticmethod
+    def _u32_view(view: memoryview, offset: int, count: int) -> Sequence[int]:
+        column = view[offset : offset + count * 4]
+        if sys.byteorder == "little":
+            return column.cast("I")
+        table = array("I", column)
+        table.byteswap()
+        return table
+
+    def load_entries(self, span: Tuple[int, int], *, compact: bool = False) -> List[Entry]:
+        first, count = span
+        entry_cls = CompactEntry if compact else Entry
+        strings, names, statuses = self.strings, self.status_names, self.statuses
+        rows = self.entries[first * _ENTRY_FIELDS : (first + count) * _ENTRY_FIELDS].tolist()
+        return [
+            entry_cls(
+                session_id=strings[rows[base]],
+                course_code=strings[rows[base + 1]],
+                slot_label=strings[rows[base + 2]],
+                time_label=strings[rows[base + 3]],
+                status=names[statuses[first + idx]],
+                code=strings[rows[base + 4]],
+            )
+            for idx, base in enumerate(range(0, count * _ENTRY_FIELDS, _ENTRY_FIELDS))
+        ]
+
+
+def _lookup(strings: Sequence[str], indexes: List[int]) -> Sequence[str]:
+    if not indexes:
+        return ()
+    if len(indexes) == 1:
+        return (strings[indexes[0]],)
+    return itemgetter(*indexes)(strings)
+
+
+def load_model_binary(path: Path, *, compact: bool = False) -> Model:
+    """Map the binary dataset at ``path``; days are built on first access."""
+    source = BinarySource(path)
+    strings = source.strings
+    session_ids = _lookup(strings, source.entries[0::_ENTRY_FIELDS].tolist())
+    day_courses = _lookup(strings, source.day_courses.tolist())
+    day_rows = source.days.tolist()
+    days: List[Day] = []
+    for base in range(0, len(day_rows), _DAY_FIELDS):
+        anchor, label, week, first, count, first_course, course_count = day_rows[base : base + _DAY_FIELDS]
+        days.append(
+            LazyDay(  # type: ignore[arg-type]
+                strings[anchor],
+                strings[label],
+                source=source,
+                span=(first, count),
+                session_ids=session_ids[first : first + count],
+                course_codes=day_courses[first_course : first_course + course_count],
+                compact=compact,
+                week=None if week == NO_WEEK else strings[week],
+            )
+        )
+    return Model(days=days, compact=compact)
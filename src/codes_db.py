@@ -0,0 +1,150 @@
+"""Attendance codes read from the ``data/<UNIT>/<WEEK>.json`` tree.
+
+Each week file holds a list of ``{"slot": ..., "code": ...}`` records. The
+tree is scanned once into a dict keyed by ``(unit, week, slot)``; after that
+:meth:`CodesDB.start` polls it in the background and loads only week files
+that are new or whose mtime changed, so weeks can be added while the server
+runs. A file of the wrong shape is logged and skipped until it changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+WeekFile = Tuple[str, str, Path, int]
+# None marks a file that parsed but is not a list of slot/code records.
+LoadedWeek = Tuple[WeekFile, Optional[List[Dict[str, str]]]]
+
+logger = logging.getLogger(__name__)
+
+
+def _week_order(week: str) -> Tuple[int, int, str]:
+    return (0, int(week), "") if week.isdigit() else (1, 0, week)
+
+
+class CodesDB:
+    def __init__(self, root: Path, *, poll_interval: float = 2.0) -> None:
+        self.root = root
+        self.poll_interval = poll_interval
+        self.version = 0
+        self._codes: Dict[Tuple[str, str, str], str] = {}
+        self._weeks: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        self._latest: Dict[str, str] = {}
+        self._mtimes: Dict[Path, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.poll()
+
+    def code_for(self, unit: str, slot: str, week: Optional[str] = None) -> Optional[str]:
+        """The code for ``slot`` of ``unit`` in ``week`` (default: the unit's latest week)."""
+        unit = unit.upper()
+        week = week or self._latest.get(unit)
+        if week is None:
+            return None
+        return self._codes.get((unit, week, slot))
+
+    def codes(self, unit: str, week: str) -> Optional[List[Dict[str, str]]]:
+        return self._weeks.get((unit.upper(), week))
+
+    def weeks(self, unit: str) -> List[str]:
+        return sorted((week for u, week in self._weeks if u == unit.upper()), key=_week_order)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def changed_files(self) -> List[WeekFile]:
+        """Week files that are new or modified since they were last loaded."""
+        changed: List[WeekFile] = []
+        try:
+            units = [entry for entry in os.scandir(self.root) if entry.is_dir()]
+        except FileNotFoundError:
+            return changed
+        for unit_entry in units:
+            try:
+                week_entries = list(os.scandir(unit_entry.path))
+            except FileNotFoundError:
+                continue
+            for entry in week_entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                mtime = entry.stat().st_mtime_ns
+                if self._mtimes.get(path) != mtime:
+                    changed.append((unit_entry.name.upper(), entry.name[: -len(".json")], path, mtime))
+        return changed
+
+    @staticmethod
+    def read(files: List[WeekFile]) -> List[LoadedWeek]:
+        loaded: List[LoadedWeek] = []
+        for week_file in files:
+            try:
+                data = json.loads(week_file[2].read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                # Missing or half-written; the mtime is not recorded, so the
+                # next poll tries again.
+                continue
+            try:
+                if not isinstance(data, list):
+                    raise TypeError
+                records = [{"slot": str(r["slot"]), "code": str(r["code"])} for r in data]
+            except (KeyError, TypeError):
+                logger.warning('Skipping %s: expected a list of {"slot": ..., "code": ...} records', week_file[2])
+                loaded.append((week_file, None))
+                continue
+            loaded.append((week_file, records))
+        return loaded
+
+    def apply(self, loaded: List[LoadedWeek]) -> int:
+        """Install parsed week files, replacing earlier copies of the same weeks.
+
+        Malformed files keep whatever copy of their week was loaded before.
+        """
+        installed = 0
+        for (unit, week, path, mtime), records in loaded:
+            self._mtimes[path] = mtime
+            if records is None:
+                continue
+            installed += 1
+            for record in self._weeks.get((unit, week), ()):
+                self._codes.pop((unit, week, record["slot"]), None)
+            self._weeks[(unit, week)] = records
+            for record in records:
+                self._codes[(unit, week, record["slot"])] = record["code"]
+            latest = self._latest.get(unit)
+            if latest is None or _week_order(week) > _week_order(latest):
+                self._latest[unit] = week
+        if installed:
+            self.version += 1
+        return installed
+
+    def poll(self) -> int:
+        """Load new or changed week files; returns how many were loaded."""
+        return self.apply(self.read(self.changed_files()))
+
+    async def start(self, app: web.Application) -> None:
+        if self.poll_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def close(self, app: web.Application) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            # Stat and parse off the event loop; the index is only mutated here.
+            changed = await loop.run_in_executor(None, self.changed_files)
+            if changed:
+                self.apply(await loop.run_in_executor(None, self.read, changed))
@@ -0,0 +1,57 @@
+"""Content-Encoding negotiation and compression for response bodies."""
+
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Optional, Set
+
+# Bodies smaller than this gain too little to be worth compressing.
+MIN_COMPRESS_SIZE = 1024
+DYNAMIC_ENCODINGS = ("gzip", "deflate")
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Codings the client accepts with a non-zero quality."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def choose_encoding(header: Optional[str], size: int) -> Optional[str]:
+    """The coding to send a ``size``-byte body with, or ``None`` for identity."""
+    if not header or size < MIN_COMPRESS_SIZE:
+        return None
+    accepted = accepted_encodings(header)
+    for encoding in DYNAMIC_ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+    if encoding == "deflate":
+        return zlib.compress(body, level)
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def cached_compress(variants: Dict[str, bytes], body: bytes, encoding: str) -> bytes:
+    """Compress ``body`` once per encoding, keeping the result in ``variants``."""
+    data = variants.get(encoding)
+    if data is None:
+        data = variants[encoding] = compress(body, encoding, level=9)
+    return data
@@ -1,13 +1,57 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import sys
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from itertools import chain, count, repeat
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, KeysView, List, Optional, Sequence, Set, Tuple
+
+
+STATUS_NAMES: List[str] = ["pending", "submitted", "locked"]
+_STATUS_CODES: Dict[str, int] = {name: idx for idx, name in enumerate(STATUS_NAMES)}
+# Shared by every StatusOverlay so no two overlays ever hold the same version.
+_overlay_versions = count(1)
+
+
+def status_code(status: str) -> int:
+    """Return the small integer code for ``status``, registering unknown names."""
+    code = _STATUS_CODES.get(status)
+    if code is None:
+        code = len(STATUS_NAMES)
+        STATUS_NAMES.append(sys.intern(status))
+        _STATUS_CODES[STATUS_NAMES[code]] = code
+    return code
+
+
+class _RecordView(Mapping):
+    """Read-only mapping over a fixed set of slot attributes.
+
+    Lets the templates read records with ``record["key"]`` exactly as they
+    read the dicts built by :func:`day_groups`, without copying.
+    """
+
+    __slots__ = ()
+    _view_fields: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._view_fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._view_fields)
+
+    def __len__(self) -> int:
+        return len(self._view_fields)
 
 
 @dataclass
-class Entry:
+class Entry(_RecordView):
+    _view_fields = ("session_id", "course_code", "slot_label", "time_label", "status")
+
     session_id: str
     course_code: str
     slot_label: str
@@ -17,47 +61,368 @@ class Entry:
 
 
 @dataclass
-class Day:
+class Day(_RecordView):
+    _view_fields = ("anchor", "label", "entries")
+
     anchor: str
     label: str
     entries: List[Entry]
+    week: Optional[str] = None
+
+
+class CompactEntry(_RecordView):
+    """Slotted :class:`Entry` with interned strings and a byte-sized status."""
+
+    __slots__ = ("session_id", "course_code", "slot_label", "time_label", "code", "_status")
+    _view_fields = ("session_id", "course_code", "slot_label", "time_label", "status")
+
+    def __init__(
+        self,
+        session_id: str,
+        course_code: str,
+        slot_label: str,
+        time_label: str,
+        status: str,
+        code: str,
+    ) -> None:
+        self.session_id = session_id
+        self.course_code = sys.intern(course_code)
+        self.slot_label = sys.intern(slot_label)
+        self.time_label = sys.intern(time_label)
+        self.code = code
+        self._status = status_code(status)
+
+    @property
+    def status(self) -> str:
+        return STATUS_NAMES[self._status]
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = status_code(value)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactEntry(session_id={self.session_id!r}, course_code={self.course_code!r}, "
+            f"slot_label={self.slot_label!r}, time_label={self.time_label!r}, "
+            f"status={self.status!r}, code={self.code!r})"
+        )
+
+
+class CompactDay(_RecordView):
+    """Slotted :class:`Day` holding its entries in an immutable tuple."""
+
+    __slots__ = ("anchor", "label", "entries", "week")
+    _view_fields = ("anchor", "label", "entries")
+
+    def __init__(
+        self,
+        anchor: str,
+        label: str,
+        entries: Sequence[CompactEntry],
+        week: Optional[str] = None,
+    ) -> None:
+        self.anchor = anchor
+        self.label = label
+        self.entries = tuple(entries)
+        self.week = week
+
+    def __repr__(self) -> str:
+        return f"CompactDay(anchor={self.anchor!r}, label={self.label!r}, entries=<{len(self.entries)}>)"
+
+
+class SessionStore:
+    """Constant-time lookups over the entries of a loaded model.
+
+    Indexes are built once from the day list and the entries are shared with
+    the days. Neither is modified afterwards: per-tenant statuses live in
+    :class:`StatusOverlay`.
+
+    Days whose ``loaded`` attribute is false (see :mod:`.lazy_loader`) are
+    indexed from their ``session_ids`` and ``course_codes`` only and parsed
+    the first time a lookup needs one of their entries. Parsing them is
+    locked, so a reload can materialize days in a worker thread while
+    requests keep reading the store.
+    """
+
+    def __init__(self, days: Iterable[Day]) -> None:
+        self._days: List[Day] = list(days)
+        self._by_session: Dict[str, Tuple[Day, Entry]] = {}
+        self._by_day_session: Dict[Tuple[str, str], Tuple[Day, Entry]] = {}
+        self._by_course: Dict[str, List[Entry]] = {}
+        self._index: Dict[str, int] = {}
+        self._session_ids: List[str] = []
+        self._session_days: List[Day] = []
+        self._deferred_anchors: Dict[str, List[Day]] = {}
+        self._deferred_courses: Dict[str, List[Day]] = {}
+        self._lock = threading.Lock()
+        deferred: List[Day] = []
+        for day in self._days:
+            if not getattr(day, "loaded", True):
+                deferred.append(day)
+                continue
+            if deferred:
+                self._index_deferred(deferred)
+                deferred = []
+            for entry in day.entries:
+                found = (day, entry)
+                # First occurrence wins, matching the old linear scan.
+                if entry.session_id not in self._index:
+                    self._by_session[entry.session_id] = found
+                    self._index[entry.session_id] = len(self._session_ids)
+                    self._session_ids.append(entry.session_id)
+                    self._session_days.append(day)
+                self._by_day_session.setdefault((day.anchor, entry.session_id), found)
+                self._by_course.setdefault(entry.course_code, []).append(entry)
+        if deferred:
+            self._index_deferred(deferred)
+        self._course_codes = sorted(set(self._by_course) | set(self._deferred_courses))
+
+    def _index_deferred(self, days: List[Day]) -> None:
+        """Index a run of deferred days from their session ids alone."""
+        index = self._index
+        start = len(self._session_ids)
+        session_ids = list(chain.from_iterable(day.session_ids for day in days))  # type: ignore[attr-defined]
+        # Common case: every id is new, so the whole run goes in with a few
+        # C-level bulk calls instead of a Python loop per session.
+        if index.keys().isdisjoint(session_ids):
+            index.update(zip(session_ids, range(start, start + len(session_ids))))
+            if len(index) - start == len(session_ids):
+                self._session_ids.extend(session_ids)
+                for day in days:
+                    self._session_days.extend(repeat(day, len(day.session_ids)))  # type: ignore[attr-defined]
+            else:
+                for session_id in session_ids:
+                    index.pop(session_id, None)
+                self._index_deferred_slow(days)
+        else:
+            self._index_deferred_slow(days)
+        for day in days:
+            self._deferred_anchors.setdefault(day.anchor, []).append(day)
+            for course_code in day.course_codes:  # type: ignore[attr-defined]
+                self._deferred_courses.setdefault(course_code, []).append(day)
+
+    def _index_deferred_slow(self, days: List[Day]) -> None:
+        for day in days:
+            for session_id in day.session_ids:  # type: ignore[attr-defined]
+                # First occurrence wins, as for loaded days.
+                if session_id not in self._index:
+                    self._index[session_id] = len(self._session_ids)
+                    self._session_ids.append(session_id)
+                    self._session_days.append(day)
+
+    def _materialize(self, day: Day) -> None:
+        with self._lock:
+            pending = self._deferred_anchors.get(day.anchor, [])
+            # Compare by identity: equality on a deferred day would parse it.
+            position = next((idx for idx, other in enumerate(pending) if other is day), None)
+            if position is None:
+                return
+            # Index before unlisting the day, so no reader sees it as done early.
+            for entry in day.entries:
+                found = (day, entry)
+                idx = self._index[entry.session_id]
+                if self._session_days[idx] is day and entry.session_id not in self._by_session:
+                    self._by_session[entry.session_id] = found
+                self._by_day_session.setdefault((day.anchor, entry.session_id), found)
+            del pending[position]
+
+    @property
+    def days(self) -> List[Day]:
+        return self._days
+
+    def get(self, session_id: str) -> Optional[Tuple[Day, Entry]]:
+        found = self._by_session.get(session_id)
+        if found is None:
+            idx = self._index.get(session_id)
+            if idx is None:
+                return None
+            self._materialize(self._session_days[idx])
+            found = self._by_session.get(session_id)
+        return found
+
+    def session_ids(self) -> KeysView[str]:
+        """Every session id, without building deferred days."""
+        return self._index.keys()
+
+    def index_of(self, session_id: str) -> Optional[int]:
+        """Dense position of ``session_id``, stable for the life of the store."""
+        return self._index.get(session_id)
+
+    def session_at(self, index: int) -> str:
+        return self._session_ids[index]
+
+    def entries(self) -> Iterator[Entry]:
+        """Unique entries in :meth:`index_of` order."""
+        for pending in self._deferred_anchors.values():
+            for day in pending[:]:
+                self._materialize(day)
+        by_session = self._by_session
+        return (by_session[session_id][1] for session_id in self._session_ids)
+
+    def get_in_day(self, day_anchor: str, session_id: str) -> Optional[Tuple[Day, Entry]]:
+        """Like :meth:`get`, but the copy of ``session_id`` on the day ``day_anchor``."""
+        found = self._by_day_session.get((day_anchor, session_id))
+        if found is None and session_id in self._index:
+            for day in self._deferred_anchors.get(day_anchor, ())[:]:
+                self._materialize(day)
+            found = self._by_day_session.get((day_anchor, session_id))
+        return found
+
+    def by_course(self, course_code: str) -> List[Entry]:
+        """Entries of ``course_code``: loaded days' first, then deferred days' once parsed."""
+        deferred = self._deferred_courses.pop(course_code, None)
+        if deferred is not None:
+            for day in deferred:
+                self._materialize(day)
+            self._by_course.setdefault(course_code, []).extend(
+                entry for day in deferred for entry in day.entries if entry.course_code == course_code
+            )
+        return self._by_course.get(course_code, [])
+
+    def course_codes(self) -> List[str]:
+        return self._course_codes
+
+    def __len__(self) -> int:
+        return len(self._index)
 
 
 @dataclass
 class Model:
     days: List[Day]
+    compact: bool = False
+    version: int = 0
+    store: SessionStore = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.store = SessionStore(self.days)
+
+
+class StatusOverlay:
+    """Sparse copy-on-write statuses layered over a shared, unmodified model.
+
+    Only sessions whose status differs from the model are stored, so an
+    overlay costs nothing until its first change. :attr:`dirty` collects the
+    sessions changed since the last render and :attr:`fragments` is scratch
+    space for the renderer's per-overlay panel cache.
+
+    :attr:`version` is drawn from one process-wide counter rather than
+    counted per overlay. Page caches key on it, and a tenant evicted and then
+    recreated under the same key must never match the old overlay's pages.
+    """
+
+    __slots__ = ("model", "statuses", "version", "dirty", "fragments")
+
+    def __init__(self, model: Model) -> None:
+        self.model = model
+        self.statuses: Dict[str, str] = {}
+        self.version = next(_overlay_versions)
+        self.dirty: Set[str] = set()
+        self.fragments: Dict[int, bytes] = {}
 
+    def status_of(self, entry: Entry) -> str:
+        return self.statuses.get(entry.session_id, entry.status)
 
-def load_model(path: Path) -> Model:
+    def set_status(self, session_id: str, status: str) -> bool:
+        """Record ``status`` for ``session_id``; returns ``False`` if nothing changed."""
+        found = self.model.store.get(session_id)
+        if found is None:
+            return False
+        base_status = found[1].status
+        if self.statuses.get(session_id, base_status) == status:
+            return False
+        if status == base_status:
+            del self.statuses[session_id]
+        else:
+            self.statuses[session_id] = status
+        self.version = next(_overlay_versions)
+        self.dirty.add(session_id)
+        return True
+
+    def rebase(self, model: Model, sessions: Set[str]) -> List[str]:
+        """Move onto ``model``, a reload of this overlay's model.
+
+        Changes to ``sessions`` (added, removed or edited in the reload) are
+        dropped in favour of the new dataset; all others carry over as they
+        are. Returns the dropped session ids.
+        """
+        self.model = model
+        dropped = [session_id for session_id in self.statuses if session_id in sessions]
+        for session_id in dropped:
+            del self.statuses[session_id]
+        self.dirty.update(dropped)
+        self.version = next(_overlay_versions)
+        return dropped
+
+    def clear(self) -> None:
+        """Drop every change, falling back to the model's statuses."""
+        if self.statuses:
+            self.dirty.update(self.statuses)
+            self.statuses.clear()
+            self.version = next(_overlay_versions)
+
+
+def build_entries(entries: Iterable[Mapping[str, Any]], *, compact: bool = False) -> List[Entry]:
+    """Build :class:`Entry` (or :class:`CompactEntry`) records from JSON objects."""
+    entry_cls = CompactEntry if compact else Entry
+    return [
+        entry_cls(
+            session_id=e["session_id"],
+            course_code=e["course_code"],
+            slot_label=e["slot_label"],
+            time_label=e["time_label"],
+            status=e.get("status", "pending"),
+            code=e.get("code", ""),
+        )
+        for e in entries
+    ]
+
+
+def load_model(
+    path: Path,
+    *,
+    compact: bool = False,
+    lazy: bool = False,
+    use_mmap: bool = False,
+) -> Model:
+    """Parse the mock JSON at ``path``.
+
+    With ``compact=True`` the days and entries are built as
+    :class:`CompactDay`/:class:`CompactEntry` records, which trade the
+    dataclass ``__dict__`` for slots and share repeated labels. ``lazy=True``
+    streams the file day by day and defers building entries until first use;
+    ``use_mmap=True`` additionally reads it through a memory map. Files in the
+    :mod:`.binary_format` are detected by their magic bytes and always mapped.
+    """
+    from .binary_format import is_binary, load_model_binary
+
+    if is_binary(path):
+        return load_model_binary(path, compact=compact)
+    if lazy or use_mmap:
+        from .lazy_loader import load_model_lazy
+
+        return load_model_lazy(path, compact=compact, use_mmap=use_mmap)
     payload = json.loads(path.read_text(encoding="utf-8"))
+    day_cls = CompactDay if compact else Day
     days: List[Day] = []
     for day in payload.get("days", []):
-        entries = [
-            Entry(
-                session_id=e["session_id"],
-                course_code=e["course_code"],
-                slot_label=e["slot_label"],
-                time_label=e["time_label"],
-                status=e.get("status", "pending"),
-                code=e.get("code", ""),
-            )
-            for e in day.get("entries", [])
-        ]
-        days.append(Day(anchor=day["anchor"], label=day["label"], entries=entries))
-    return Model(days=days)
+        entries = build_entries(day.get("entries", []), compact=compact)
+        days.append(day_cls(anchor=day["anchor"], label=day["label"], entries=entries, week=day_week(day)))
+    return Model(days=days, compact=compact)
+
+
+def day_week(day: Dict[str, Any]) -> Optional[str]:
+    """The optional teaching week of a day record, as the codes tree names it."""
+    week = day.get("week")
+    return None if week is None else str(week)
 
 
 def find_entry(model: Model, session_id: str) -> Optional[Tuple[Day, Entry]]:
-    for day in model.days:
-        for entry in day.entries:
-            if entry.session_id == session_id:
-                return day, entry
-    return None
+    return model.store.get(session_id)
 
 
 def day_groups(model: Model) -> List[Dict[str, object]]:
     groups: List[Dict[str, object]] = []
-    for day in model.days:
+    for day in model.store.days:
         groups.append(
             {
                 "anchor": day.anchor,
@@ -75,3 +440,12 @@ def day_groups(model: Model) -> List[Dict[str, object]]:
             }
         )
     return groups
+
+
+def day_views(model: Model) -> Sequence[Mapping[str, object]]:
+    """Day groups for the templates.
+
+    Days and entries already behave as read-only mappings, so the live records
+    are returned as-is; statuses read through them are always current.
+    """
+    return model.store.days
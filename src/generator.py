@@ -0,0 +1,227 @@
+"""Deterministic synthetic datasets for load testing.
+
+``generate`` writes a ``load_model`` JSON dataset plus the matching
+``<UNIT>/<WEEK>.json`` codes tree, and optionally a journal that gives each
+simulated student their own statuses (load it with ``--journal``). Output is
+streamed day by day, so only one week of codes is ever held in memory. Course
+codes and slot labels are taken from an existing codes tree (``data/`` by
+default); the same seed always produces byte-identical files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from . import PACKAGE_ROOT
+from .codes_db import CodesDB
+
+DEFAULT_SOURCE = PACKAGE_ROOT.parent / "data"
+DEFAULT_SLOTS = ["Lecture 01", "Tutorial 01", "Laboratory 01", "Workshop 01"]
+TIME_LABELS = ["08:00 am", "09:00 am", "10:00 am", "11:00 am", "01:00 pm", "02:00 pm", "03:00 pm", "04:00 pm", "05:30 pm"]
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+DAYS_PER_WEEK = 5
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``"pending=6,submitted=3,locked=1"`` into status weights."""
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if not name.strip() or not weight:
+            raise ValueError(f"Expected status=weight, got {part!r}")
+        mix[name.strip()] = float(weight)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The status mix needs a positive total weight")
+    return mix
+
+
+def catalog(source: Path, units: int) -> List[Tuple[str, List[str]]]:
+    """``units`` course codes with their slot labels, taken from the codes tree at ``source``.
+
+    Units are reused in sorted order; if the tree has fewer than requested,
+    synthetic ``FIT9xxx`` units borrow the known slot labels round-robin.
+    Week files are read as the server reads them, so malformed ones are
+    logged and skipped.
+    """
+    known: List[Tuple[str, List[str]]] = []
+    if source.is_dir():
+        for unit_dir in sorted(p for p in source.iterdir() if p.is_dir()):
+            slots: Dict[str, None] = {}
+            week_files = [(unit_dir.name.upper(), path.stem, path, 0) for path in sorted(unit_dir.glob("*.json"))]
+            for _, records in CodesDB.read(week_files):
+                if records is not None:
+                    slots.update(dict.fromkeys(record["slot"] for record in records))
+            if slots:
+                known.append((unit_dir.name.upper(), sorted(slots)))
+    if not known:
+        known = [("FIT1045", list(DEFAULT_SLOTS))]
+    result = known[:units]
+    for idx in range(len(result), units):
+        result.append((f"FIT9{idx:03d}", known[idx % len(known)][1]))
+    return result
+
+
+def _code(rng: random.Random) -> str:
+    return "".join(rng.choice(CODE_ALPHABET) for _ in range(5))
+
+
+def _weekdays(start: date) -> Iterator[date]:
+    day = start
+    while True:
+        if day.weekday() < DAYS_PER_WEEK:
+            yield day
+        day += timedelta(days=1)
+
+
+def _week_of(day: date, start: date, first_week: int) -> int:
+    """Teaching week of ``day``, counting calendar weeks (Monday to Sunday) from ``start``'s."""
+    first_monday = start - timedelta(days=start.weekday())
+    return first_week + (day - first_monday).days // 7
+
+
+def _write_codes(codes_dir: Path, week: int, codes: Dict[str, Dict[str, str]]) -> None:
+    for unit, slots in codes.items():
+        unit_dir = codes_dir / unit
+        unit_dir.mkdir(parents=True, exist_ok=True)
+        records = [{"slot": slot, "code": code} for slot, code in slots.items()]
+        (unit_dir / f"{week}.json").write_text(json.dumps(records, indent=2) + "\n", encoding="utf-8")
+
+
+def generate(
+    dataset_path: Path,
+    codes_dir: Path,
+    *,
+    days: int = 60,
+    units: int = 8,
+    sessions_per_day: int = 20,
+    status_mix: Optional[Dict[str, float]] = None,
+    students: int = 0,
+    journal_path: Optional[Path] = None,
+    seed: int = 0,
+    start: date = date(2025, 7, 28),
+    first_week: int = 1,
+    first_session_id: int = 700000,
+    source: Path = DEFAULT_SOURCE,
+) -> int:
+    """Write a synthetic dataset and its codes tree; returns the number of entries.
+
+    Each unit/slot gets one code per week. With ``students`` and
+    ``journal_path``, every student's sessions are redrawn from ``status_mix``
+    and written to the journal under tenant ``student-<n>``.
+    """
+    mix = status_mix or {"pending": 6, "submitted": 3, "locked": 1}
+    statuses: Sequence[str] = list(mix)
+    weights: Sequence[float] = list(mix.values())
+    units_catalog = catalog(source, units)
+    rng = random.Random(seed)
+    week_codes: Dict[str, Dict[str, str]] = {}
+    week = first_week
+    session_id = first_session_id
+    journal: Optional[TextIO] = None
+    if students and journal_path is not None:
+        journal = open(journal_path, "w", encoding="utf-8")
+    try:
+        with open(dataset_path, "w", encoding="utf-8") as out:
+            out.write('{"days": [')
+            for day_idx, day in zip(range(days), _weekdays(start)):
+                day_week = _week_of(day, start, first_week)
+                if day_week != week:
+                    _write_codes(codes_dir, week, week_codes)
+                    week_codes, week = {}, day_week
+                entries = []
+                for time_label in sorted(rng.choices(TIME_LABELS, k=sessions_per_day), key=TIME_LABELS.index):
+                    unit, slots = rng.choice(units_catalog)
+                    slot = rng.choice(slots)
+                    unit_codes = week_codes.setdefault(unit, {})
+                    if slot not in unit_codes:
+                        unit_codes[slot] = _code(rng)
+                    entries.append(
+                        {
+                            "session_id": str(session_id),
+                            "course_code": unit,
+                            "slot_label": slot,
+                            "time_label": time_label,
+                            "status": rng.choices(statuses, weights)[0],
+                            "code": unit_codes[slot],
+                        }
+                    )
+                    session_id += 1
+                record = {
+                    "anchor": day.strftime("%d_%b_%y"),
+                    "label": f"{day.strftime('%A')}, {day.day} {day.strftime('%B')}",
+                    "week": str(day_week),
+                    "entries": entries,
+                }
+                out.write((",\n" if day_idx else "\n") + json.dumps(record))
+                if journal is not None:
+                    for student in range(students):
+                        tenant = f"student-{student:04d}"
+                        drawn = rng.choices(statuses, weights, k=len(entries))
+                        journal.write(
+                            "".join(
+                                f"{tenant}\t{entry['session_id']}\t{status}\n"
+                                for entry, status in zip(entries, drawn)
+                                if status != entry["status"]
+                            )
+                        )
+            out.write("\n]}\n")
+        if week_codes:
+            _write_codes(codes_dir, week, week_codes)
+    finally:
+        if journal is not None:
+            journal.close()
+    return session_id - first_session_id
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.server generate",
+        description="Generate a synthetic dataset with matching codes files.",
+    )
+    parser.add_argument("output", type=Path, help="Directory for units.json, data/ and students.journal")
+    parser.add_argument("--days", type=int, default=60, help="Weekdays to generate")
+    parser.add_argument("--units", type=int, default=8, help="Distinct units")
+    parser.add_argument("--sessions-per-day", type=int, default=20)
+    parser.add_argument(
+        "--status-mix",
+        type=parse_mix,
+        default=None,
+        help="Status weights, e.g. pending=6,submitted=3,locked=1",
+    )
+    parser.add_argument("--students", type=int, default=0, help="Students given their own statuses in a journal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 7, 28), help="First day (YYYY-MM-DD)")
+    parser.add_argument("--first-week", type=int, default=1)
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="Codes tree to take units and slots from")
+    args = parser.parse_args(argv)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    dataset_path = args.output / "units.json"
+    codes_dir = args.output / "data"
+    journal_path = args.output / "students.journal" if args.students else None
+    entries = generate(
+        dataset_path,
+        codes_dir,
+        days=args.days,
+        units=args.units,
+        sessions_per_day=args.sessions_per_day,
+        status_mix=args.status_mix,
+        students=args.students,
+        journal_path=journal_path,
+        seed=args.seed,
+        start=args.start,
+        first_week=args.first_week,
+        source=args.source,
+    )
+    print(f"Wrote {entries} entries over {args.days} days to {dataset_path} with codes in {codes_dir}")
+    if journal_path is not None:
+        print(f"Student statuses for {args.students} students in {journal_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Append-only journal of status transitions.
+
+Each line is ``tenant<TAB>session_id<TAB>status``. A line with an empty
+session id and status resets that tenant, and tenant ``*`` resets everything.
+Appends are buffered and written by one background task, so all requests
+waiting on a batch share a single ``write`` + ``fsync`` (group commit). Once
+enough events accumulate the file is rewritten as a snapshot of live state.
+Tenants evicted from the registry are journaled as resets, so a replay
+agrees with the live state whether or not a compaction ran in between.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from itertools import repeat
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+from .tenants import TenantRegistry
+
+RESET_ALL = "*"
+
+logger = logging.getLogger(__name__)
+
+
+def _field(value: str) -> bytes:
+    return value.replace("\t", " ").replace("\n", " ").encode("utf-8")
+
+
+def _record(tenant: str, session_id: str, status: str) -> bytes:
+    return b"\t".join((_field(tenant), _field(session_id), _field(status))) + b"\n"
+
+
+def _apply_lines(final: Dict[bytes, bytes], chunk: bytes) -> None:
+    lines = chunk.split(b"\n")
+    lines.pop()
+    # dict.update keeps the last status per "tenant\tsession" key.
+    final.update(map(bytes.rsplit, lines, repeat(b"\t"), repeat(1)))
+
+
+def _merge(tenants: Dict[bytes, Dict[bytes, bytes]], segment: Dict[bytes, bytes]) -> None:
+    for key, status in segment.items():
+        tenant, _, session_id = key.partition(b"\t")
+        statuses = tenants.get(tenant)
+        if statuses is None:
+            statuses = tenants[tenant] = {}
+        statuses[session_id] = status
+
+
+def collapse(data: bytes) -> Dict[bytes, bytes]:
+    """Reduce journal bytes to the final status per ``b"tenant\\tsession"`` key.
+
+    Runs between resets are collapsed with bulk dict updates. At each reset
+    the run is folded into per-tenant dicts, so a tenant reset is one ``pop``
+    and the whole replay stays linear in the journal size.
+    """
+    if not data.endswith(b"\n"):
+        # A torn final write from a crash; drop the partial record.
+        data = data[: data.rfind(b"\n") + 1]
+    tenants: Dict[bytes, Dict[bytes, bytes]] = {}
+    final: Dict[bytes, bytes] = {}
+    start = 0
+    while True:
+        # Only reset lines contain an empty field, so "\t\t" finds them.
+        mark = data.find(b"\t\t\n", start)
+        if mark < 0:
+            _apply_lines(final, data[start:])
+            break
+        line_start = max(data.rfind(b"\n", start, mark) + 1, start)
+        _apply_lines(final, data[start:line_start])
+        _merge(tenants, final)
+        final = {}
+        tenant = data[line_start:mark]
+        if tenant == RESET_ALL.encode():
+            tenants.clear()
+        else:
+            tenants.pop(tenant, None)
+        start = mark + 3
+    if not tenants:
+        return final
+    _merge(tenants, final)
+    return {
+        tenant + b"\t" + session_id: status
+        for tenant, statuses in tenants.items()
+        for session_id, status in statuses.items()
+    }
+
+
+class Journal:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_interval: float = 0.002,
+        compact_after: int = 100_000,
+    ) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self.events_since_compact = 0
+        self.tenants: Optional[TenantRegistry] = None
+        self._buffer: List[bytes] = []
+        self._batch: Optional[asyncio.Future] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._file: Optional[BinaryIO] = None
+
+    def attach(self, tenants: TenantRegistry) -> None:
+        """Snapshot ``tenants`` on compaction and journal their evictions."""
+        self.tenants = tenants
+        tenants.on_evict = self.forget
+
+    def replay(self, tenants: TenantRegistry) -> int:
+        """Apply the journal to ``tenants``; returns the number of statuses applied."""
+        self.attach(tenants)
+        if not self.path.exists():
+            return 0
+        data = self.path.read_bytes()
+        applied = 0
+        for key, status in collapse(data).items():
+            tenant, _, session_id = key.partition(b"\t")
+            overlay = tenants.get(tenant.decode("utf-8"))
+            if overlay.set_status(session_id.decode("utf-8"), status.decode("utf-8")):
+                applied += 1
+        self.events_since_compact = data.count(b"\n")
+        return applied
+
+    async def start(self, app: web.Application) -> None:
+        self._file = open(self.path, "ab")
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self._buffer:
+            # Evictions noted while replaying go out with the first batch.
+            self._append()
+
+    async def close(self, app: web.Application) -> None:
+        if self._task is not None:
+            # Let a flush in progress finish rather than cancelling it, so its
+            # waiters are answered and no executor write outlives the file.
+            self._stopping = True
+            assert self._wakeup is not None
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        try:
+            await self._flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _append(self, *records: bytes) -> asyncio.Future:
+        if self._batch is None:
+            self._batch = asyncio.get_running_loop().create_future()
+        self._buffer.extend(records)
+        assert self._wakeup is not None, "Journal.start() has not run"
+        self._wakeup.set()
+        return self._batch
+
+    async def record(self, tenant: str, session_id: str, status: str) -> None:
+        """Journal a status change; returns once its batch has been fsynced."""
+        await asyncio.shield(self._append(_record(tenant, session_id, status)))
+
+    async def record_many(self, tenant: str, changes: Iterable[Tuple[str, str]]) -> None:
+        """Journal ``(session_id, status)`` changes together in one batch."""
+        records = [_record(tenant, session_id, status) for session_id, status in changes]
+        if records:
+            await asyncio.shield(self._append(*records))
+
+    async def record_reset(self, tenant: str = RESET_ALL) -> None:
+        await asyncio.shield(self._append(_record(tenant, "", "")))
+
+    def forget(self, tenant: str) -> None:
+        """Journal a reset of an evicted tenant without waiting for it."""
+        if self._wakeup is None:
+            self._buffer.append(_record(tenant, "", ""))
+        else:
+            self._append(_record(tenant, "", ""))
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopping:
+                # close() flushes whatever is left.
+                return
+            # Give concurrent requests a moment to join this batch.
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._flush()
+            except Exception:
+                # _flush fails its own waiters; keep serving later batches.
+                logger.exception("Journal flush of %s failed", self.path)
+
+    async def _flush(self) -> None:
+        buffer, batch = self._buffer, self._batch
+        self._buffer, self._batch = [], None
+        if not buffer or batch is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, b"".join(buffer))
+        except Exception as exc:
+            batch.set_exception(exc)
+            raise
+        batch.set_result(None)
+        self.events_since_compact += len(buffer)
+        if self.events_since_compact >= self.compact_after and self.tenants is not None:
+            snapshot = self.snapshot(self.tenants)
+            # Counted as done either way, so a failing compaction is retried
+            # after another compact_after events rather than on every batch.
+            self.events_since_compact = snapshot.count(b"\n")
+            await loop.run_in_executor(None, self._compact, snapshot)
+
+    def _write(self, data: bytes) -> None:
+        assert self._file is not None
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @staticmethod
+    def snapshot(tenants: TenantRegistry) -> bytes:
+        """Journal bytes that recreate the current state of ``tenants``."""
+        return b"".join(
+            _record(key, session_id, status)
+            for key, overlay in tenants.items()
+            for session_id, status in overlay.statuses.items()
+        )
+
+    def _compact(self, snapshot: bytes) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "wb") as tmp:
+                tmp.write(snapshot)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+        except OSError:
+            # The live journal and its handle are untouched; appends go on.
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, self.path)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "ab")
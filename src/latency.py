@@ -0,0 +1,408 @@
+"""Emulated latency, concurrency limits and rate limits per route.
+
+Configured from a JSON file (``--latency-config``) or at runtime through
+``/mock/config``::
+
+    {
+      "seed": 1,
+      "default": {"latency": {"type": "fixed", "ms": 20}},
+      "routes": {
+        "/Student/Units.aspx": {
+          "latency": {"type": "normal", "mean_ms": 400, "stddev_ms": 120, "min_ms": 50},
+          "max_concurrency": 20, "queue_size": 200, "queue_timeout_ms": 5000,
+          "rate_limit": {"per_second": 50, "burst": 10, "scope": "client"}
+        },
+        "POST /Student/Entry.aspx": {
+          "latency": {"type": "histogram", "buckets": [[100, 30], [250, 50], [1000, 15], [4000, 5]]}
+        }
+      }
+    }
+
+Route keys are canonical paths as shown in ``/mock/metrics``, matched in any
+casing and optionally prefixed with a method. ``default`` covers every other
+route except ``/mock/*``. A request is first checked against the token bucket
+(429 with ``Retry-After`` when empty), then waits for one of
+``max_concurrency`` slots in FIFO order (503 when ``queue_size`` requests
+already wait or after ``queue_timeout_ms``), then holds its slot for the
+sampled latency plus the handler's own time. The wait is an asyncio timer,
+so emulated slowness costs the event loop nothing while it lasts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import math
+import random
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from aiohttp import hdrs, web
+from aiohttp.web_urldispatcher import AbstractRoute
+
+from .tenants import TENANT_COOKIE, TENANT_HEADER
+
+DISTRIBUTIONS = ("fixed", "normal", "histogram")
+SCOPES = ("route", "client")
+MAX_CLIENT_BUCKETS = 4096
+_CONFIG_PREFIX = "/mock/"
+
+# What IIS sends when its request queue is full, and the 429 equivalent.
+_ERROR_PAGE = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01//EN""http://www.w3.org/TR/html4/strict.dtd">\r\n'
+    '<HTML><HEAD><TITLE>{title}</TITLE>\r\n'
+    '<META HTTP-EQUIV="Content-Type" Content="text/html; charset=us-ascii"></HEAD>\r\n'
+    "<BODY><h2>{title}</h2>\r\n"
+    "<hr><p>HTTP Error {status}. {message}</p>\r\n"
+    "</BODY></HTML>\r\n"
+)
+_ERRORS = {
+    429: ("Too Many Requests", "The client has sent too many requests."),
+    503: ("Service Unavailable", "The service is unavailable."),
+}
+
+
+class QueueTimeout(Exception):
+    pass
+
+
+def _check(value: Any, name: str, minimum: float = 0.0) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < minimum:
+        raise ValueError(f"{name!r} must be a number >= {minimum:g}")
+    return float(value)
+
+
+def _number(spec: Dict[str, Any], key: str, default: Optional[float] = None, *, minimum: float = 0.0) -> float:
+    value = spec.get(key, default)
+    if value is None:
+        raise ValueError(f"missing {key!r}")
+    return _check(value, key, minimum)
+
+
+class Distribution:
+    """Samples a latency in seconds."""
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        kind = spec.get("type", "fixed")
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"latency type must be one of {', '.join(DISTRIBUTIONS)}")
+        self.kind = kind
+        self.min_ms = _number(spec, "min_ms", 0.0)
+        self.max_ms = _number(spec, "max_ms", math.inf)
+        self.ms = self.mean_ms = self.stddev_ms = 0.0
+        self._bounds: List[float] = []
+        self._cumulative: List[float] = []
+        if kind == "fixed":
+            self.ms = _number(spec, "ms")
+        elif kind == "normal":
+            self.mean_ms = _number(spec, "mean_ms")
+            self.stddev_ms = _number(spec, "stddev_ms")
+        else:
+            buckets = spec.get("buckets")
+            if not isinstance(buckets, list) or not buckets:
+                raise ValueError("histogram needs 'buckets' as [[upper_ms, count], ...]")
+            total = 0.0
+            for bucket in buckets:
+                if not isinstance(bucket, list) or len(bucket) != 2:
+                    raise ValueError("histogram buckets must be [upper_ms, count] pairs")
+                upper, count = _check(bucket[0], "upper_ms"), _check(bucket[1], "count")
+                if self._bounds and upper <= self._bounds[-1]:
+                    raise ValueError("histogram bucket bounds must increase")
+                total += count
+                self._bounds.append(upper)
+                self._cumulative.append(total)
+            if total <= 0:
+                raise ValueError("histogram buckets are all empty")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.ms
+        elif self.kind == "normal":
+            ms = rng.gauss(self.mean_ms, self.stddev_ms)
+        else:
+            index = bisect.bisect_right(self._cumulative, rng.random() * self._cumulative[-1])
+            index = min(index, len(self._bounds) - 1)
+            lower = self._bounds[index - 1] if index else 0.0
+            ms = rng.uniform(lower, self._bounds[index])
+        return min(max(ms, self.min_ms), self.max_ms) / 1000
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ConcurrencyGate:
+    """At most ``limit`` holders; up to ``queue_size`` more wait in FIFO order."""
+
+    def __init__(self, limit: int, queue_size: int, timeout: Optional[float]) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def full(self) -> bool:
+        return self.active >= self.limit and len(self._waiters) >= self.queue_size
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(self.timeout, _expire, waiter) if self.timeout is not None else None
+        try:
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # Handed a slot just as the client went away.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def release(self) -> None:
+        # The slot passes straight to the first waiter, so ``active`` is unchanged.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+def _expire(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_exception(QueueTimeout())
+
+
+class RouteProfile:
+    def __init__(self, key: str, spec: Dict[str, Any]) -> None:
+        if not isinstance(spec, dict):
+            raise ValueError(f"{key}: expected an object")
+        unknown = set(spec) - {"latency", "max_concurrency", "queue_size", "queue_timeout_ms", "rate_limit"}
+        if unknown:
+            raise ValueError(f"{key}: unknown settings {', '.join(sorted(unknown))}")
+        try:
+            self.latency = Distribution(spec["latency"]) if "latency" in spec else None
+            self.gate: Optional[ConcurrencyGate] = None
+            if "max_concurrency" in spec:
+                timeout = spec.get("queue_timeout_ms")
+                self.gate = ConcurrencyGate(
+                    int(_number(spec, "max_concurrency", minimum=1)),
+                    int(_number(spec, "queue_size", 1000)),
+                    _check(timeout, "queue_timeout_ms") / 1000 if timeout is not None else None,
+                )
+            self.rate: Optional[Tuple[float, float]] = None
+            self.scope = "route"
+            if "rate_limit" in spec:
+                limit = spec["rate_limit"]
+                rate = _number(limit, "per_second", minimum=0.001)
+                self.rate = (rate, _number(limit, "burst", max(1.0, rate), minimum=1))
+                self.scope = limit.get("scope", "route")
+                if self.scope not in SCOPES:
+                    raise ValueError(f"rate_limit scope must be one of {', '.join(SCOPES)}")
+        except (ValueError, TypeError, AttributeError) as exc:
+            raise ValueError(f"{key}: {exc}") from None
+        self.key = key
+        self.rejected: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self._bucket = TokenBucket(*self.rate) if self.rate is not None else None
+        self._client_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def bucket_for(self, request: web.Request) -> Optional[TokenBucket]:
+        if self.rate is None or self.scope == "route":
+            return self._bucket
+        client = request.headers.get(TENANT_HEADER) or request.cookies.get(TENANT_COOKIE) or request.remote or ""
+        bucket = self._client_buckets.get(client)
+        if bucket is None:
+            bucket = self._client_buckets[client] = TokenBucket(*self.rate)
+            if len(self._client_buckets) > MAX_CLIENT_BUCKETS:
+                self._client_buckets.popitem(last=False)
+        else:
+            self._client_buckets.move_to_end(client)
+        return bucket
+
+    def status(self) -> Dict[str, object]:
+        status: Dict[str, object] = {"rejected": dict(self.rejected)}
+        if self.gate is not None:
+            status.update(active=self.gate.active, queued=self.gate.queued)
+        return status
+
+
+class LatencyEmulator:
+    """The live configuration and the per-route state that enforces it."""
+
+    def __init__(self) -> None:
+        self.config: Dict[str, Any] = {}
+        self.enabled = False
+        self._default: Optional[RouteProfile] = None
+        self._profiles: Dict[str, RouteProfile] = {}
+        self._by_route: Dict[AbstractRoute, Optional[RouteProfile]] = {}
+        # Rejections counted by replaced configs, so the metric never drops.
+        self._retired: Dict[str, int] = {}
+        self.rng = random.Random()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Validate ``config`` and replace the current one (``{}`` turns emulation off)."""
+        if not isinstance(config, dict):
+            raise ValueError("config must be a JSON object")
+        unknown = set(config) - {"seed", "default", "routes"}
+        if unknown:
+            raise ValueError(f"unknown settings {', '.join(sorted(unknown))}")
+        routes = config.get("routes", {})
+        if not isinstance(routes, dict):
+            raise ValueError("'routes' must map route keys to settings")
+        default = RouteProfile("default", config["default"]) if "default" in config else None
+        profiles: Dict[str, RouteProfile] = {}
+        for key, spec in routes.items():
+            method, _, path = key.rpartition(" ")
+            if not path.startswith("/"):
+                raise ValueError(f"{key}: route keys are '/path' or 'METHOD /path'")
+            profiles[f"{method.upper()} {path.lower()}".lstrip()] = RouteProfile(key, spec)
+        # In-flight requests keep the gates they hold; new requests use these.
+        self._retired = self.rejection_totals()
+        self.config = config
+        self._default, self._profiles = default, profiles
+        self._by_route = {}
+        self.rng = random.Random(config.get("seed"))
+        self.enabled = default is not None or bool(profiles)
+
+    def load(self, path: Path) -> None:
+        try:
+            config = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path}: {exc}") from None
+        self.configure(config)
+
+    def profile_for(self, request: web.Request) -> Optional[RouteProfile]:
+        route = request.match_info.route
+        try:
+            return self._by_route[route]
+        except KeyError:
+            pass
+        resource = route.resource
+        path = resource.canonical.lower() if resource is not None else request.path.lower()
+        profile = self._profiles.get(f"{request.method} {path}") or self._profiles.get(path)
+        if profile is None and not path.startswith(_CONFIG_PREFIX):
+            profile = self._default
+        if resource is not None:
+            # Unmatched requests get a fresh route object each time; don't keep those.
+            self._by_route[route] = profile
+        return profile
+
+    def status(self) -> Dict[str, object]:
+        routes = {profile.key: profile.status() for profile in self._profiles.values()}
+        if self._default is not None:
+            routes["default"] = self._default.status()
+        return {"enabled": self.enabled, "config": self.config, "routes": routes}
+
+    def rejection_totals(self) -> Dict[str, int]:
+        totals = dict(self._retired)
+        profiles = list(self._profiles.values())
+        if self._default is not None:
+            profiles.append(self._default)
+        for profile in profiles:
+            for reason, count in profile.rejected.items():
+                totals[reason] = totals.get(reason, 0) + count
+        return totals
+
+
+def error_response(status: int, retry_after: Optional[float] = None) -> web.Response:
+    title, message = _ERRORS[status]
+    headers = {hdrs.RETRY_AFTER: str(max(1, math.ceil(retry_after)))} if retry_after is not None else None
+    return web.Response(
+        status=status,
+        text=_ERROR_PAGE.format(title=title, status=status, message=message),
+        content_type="text/html",
+        headers=headers,
+    )
+
+
+@web.middleware
+async def latency_middleware(request: web.Request, handler):
+    emulator: LatencyEmulator = request.app["latency"]
+    if not emulator.enabled:
+        return await handler(request)
+    profile = emulator.profile_for(request)
+    if profile is None:
+        return await handler(request)
+    bucket = profile.bucket_for(request)
+    if bucket is not None:
+        wait = bucket.take()
+        if wait:
+            profile.rejected["rate_limited"] += 1
+            return error_response(429, wait)
+    gate = profile.gate
+    if gate is not None:
+        if gate.full():
+            profile.rejected["queue_full"] += 1
+            return error_response(503, 1)
+        try:
+            await gate.acquire()
+        except QueueTimeout:
+            profile.rejected["queue_timeout"] += 1
+            return error_response(503, 1)
+    try:
+        delay = profile.latency.sample(emulator.rng) if profile.latency is not None else 0.0
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await handler(request)
+    finally:
+        if gate is not None:
+            gate.release()
+
+
+async def config_status_handler(request: web.Request) -> web.Response:
+    return web.json_response(request.app["latency"].status())
+
+
+async def config_update_handler(request: web.Request) -> web.Response:
+    """Replace the latency config with the JSON body; ``{}`` turns emulation off."""
+    emulator: LatencyEmulator = request.app["latency"]
+    try:
+        emulator.configure(await request.json())
+    except ValueError as exc:
+        # json.JSONDecodeError is a ValueError too.
+        raise web.HTTPBadRequest(text=str(exc))
+    return web.json_response(emulator.status())
+
+
+def install_latency(app: web.Application, config_path: Optional[Path] = None) -> LatencyEmulator:
+    emulator = LatencyEmulator()
+    if config_path is not None:
+        emulator.load(config_path)
+    app["latency"] = emulator
+    app.add_routes(
+        [
+            web.get("/mock/config", config_status_handler),
+            web.post("/mock/config", config_update_handler),
+        ]
+    )
+    return emulator
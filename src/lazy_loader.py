@@ -0,0 +1,146 @@
+"""Streaming loader that defers building a day's entries until first use.
+
+The dataset is walked one day object at a time with
+:meth:`json.JSONDecoder.raw_decode`, so only a single day's JSON tree is alive
+during the scan. Each day keeps its byte span plus the session ids and course
+codes the :class:`SessionStore` needs for its indexes, and the decoded day is
+dropped at once; the entries themselves are parsed from that span again on
+first access. A day is therefore decoded twice if it is ever used, which is
+the price of keeping untouched days out of memory: a brace- and string-aware
+regex skip measured slower than ``raw_decode`` here, and keeping decoded days
+would cost as much memory as the eager loader. The file can be read through
+``mmap`` so untouched days never need to be resident.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import re
+import threading
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .data_loader import Day, Entry, Model, _RecordView, build_entries, day_week
+
+_DAYS_ARRAY = re.compile(rb'"days"\s*:\s*\[')
+_SEPARATOR = re.compile(rb"[\s,]*")
+_MIN_WINDOW = 4 * 1024
+# Days may be parsed by a reload's worker thread and the event loop at once.
+_parse_lock = threading.Lock()
+
+
+class DaySource:
+    """The dataset's bytes, either read into memory or memory-mapped."""
+
+    def __init__(self, path: Path, *, use_mmap: bool = False) -> None:
+        self.buffer: Union[bytes, mmap.mmap] = b""
+        if use_mmap and path.stat().st_size:
+            with open(path, "rb") as handle:
+                self.buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buffer = path.read_bytes()
+
+    def load_entries(self, span: Tuple[int, int], *, compact: bool = False) -> List[Entry]:
+        payload = json.loads(self.buffer[span[0] : span[1]])
+        return build_entries(payload.get("entries", []), compact=compact)
+
+    def scan_days(self) -> Iterator[Tuple[int, int, dict]]:
+        """Yield ``(start, end, day)`` for each object in the ``days`` array."""
+        buffer = self.buffer
+        match = _DAYS_ARRAY.search(buffer)
+        if match is None:
+            return
+        decoder = json.JSONDecoder()
+        pos = match.end()
+        window = _MIN_WINDOW
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()  # type: ignore[union-attr]
+            if buffer[pos : pos + 1] in (b"]", b""):
+                return
+            while True:
+                # A multi-byte character cut at the window edge lies past the
+                # end of any day that fits, so dropping it is harmless.
+                text = buffer[pos : pos + window].decode("utf-8", errors="ignore")
+                try:
+                    day, end = decoder.raw_decode(text)
+                    break
+                except json.JSONDecodeError:
+                    if pos + window >= len(buffer):
+                        raise
+                    window *= 2
+            size = len(text[:end].encode("utf-8"))
+            yield pos, pos + size, day
+            pos += size
+            # Size the next window from this day: decoding a window much
+            # larger than the day cost more than the day's own parse.
+            window = max(_MIN_WINDOW, size + size // 2)
+
+
+class LazyDay(_RecordView):
+    """A :class:`Day` whose entries are built from its span of a source on first access.
+
+    ``source`` is anything with a ``load_entries(span, compact=...)`` method,
+    such as :class:`DaySource` or :class:`~.binary_format.BinarySource`.
+    """
+
+    __slots__ = ("anchor", "label", "week", "session_ids", "course_codes", "_source", "_span", "_compact", "_entries")
+    _view_fields = ("anchor", "label", "entries")
+
+    def __init__(
+        self,
+        anchor: str,
+        label: str,
+        *,
+        source: Any,
+        span: Tuple[int, int],
+        session_ids: Sequence[str],
+        course_codes: Sequence[str],
+        compact: bool = False,
+        week: Optional[str] = None,
+    ) -> None:
+        self.anchor = anchor
+        self.label = label
+        self.week = week
+        self.session_ids = session_ids
+        self.course_codes = course_codes
+        self._source = source
+        self._span = span
+        self._compact = compact
+        self._entries: Optional[List[Entry]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    @property
+    def entries(self) -> List[Entry]:
+        if self._entries is None:
+            with _parse_lock:
+                if self._entries is None:
+                    self._entries = self._source.load_entries(self._span, compact=self._compact)
+        return self._entries
+
+    def __repr__(self) -> str:
+        state = f"{len(self._entries)} entries" if self._entries is not None else "deferred"
+        return f"LazyDay(anchor={self.anchor!r}, label={self.label!r}, {state})"
+
+
+def load_model_lazy(path: Path, *, compact: bool = False, use_mmap: bool = False) -> Model:
+    source = DaySource(path, use_mmap=use_mmap)
+    days: List[Day] = []
+    for start, end, day in source.scan_days():
+        entries = day.get("entries", [])
+        days.append(
+            LazyDay(  # type: ignore[arg-type]
+                day["anchor"],
+                day["label"],
+                source=source,
+                span=(start, end),
+                session_ids=[entry["session_id"] for entry in entries],
+                course_codes=list({entry["course_code"]: None for entry in entries}),
+                compact=compact,
+                week=day_week(day),
+            )
+        )
+    return Model(days=days, compact=compact)
@@ -0,0 +1,177 @@
+"""Request metrics in the Prometheus text exposition format.
+
+Every route gets its histograms when it is first registered or seen, with
+fixed bucket arrays, so recording a request is a couple of bisects and
+in-place integer increments. Handlers time their lookup and render phases
+into :attr:`Metrics.phases` so those show up apart from total handler time.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from aiohttp import web
+from aiohttp.web_urldispatcher import AbstractRoute
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+PHASE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+SUBMISSION_OUTCOMES = ("ok", "invalid", "locked", "already_submitted")
+PHASES = (("units", "render"), ("entry", "lookup"), ("entry", "render"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+T = TypeVar("T")
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        # One slot per bound plus +Inf; made cumulative only when exported.
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def timed(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``fn`` and observe how long it took."""
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def lines(self, name: str, labels: str) -> Iterable[str]:
+        cumulative = 0
+        sep = "," if labels else ""
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{sep}le="{bound:g}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{labels}{sep}le="+Inf"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.total:.9g}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class RouteMetrics:
+    __slots__ = ("labels", "latency", "size", "status_classes")
+
+    def __init__(self, path: str, method: str) -> None:
+        self.labels = f'route="{_escape(path)}",method="{_escape(method)}"'
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.status_classes = [0] * 6
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _route_path(route: AbstractRoute) -> str:
+    resource = route.resource
+    return resource.canonical if resource is not None else "unmatched"
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.submissions: Dict[str, int] = dict.fromkeys(SUBMISSION_OUTCOMES, 0)
+        self.phases: Dict[Tuple[str, str], Histogram] = {key: Histogram(PHASE_BUCKETS) for key in PHASES}
+        self._routes: Dict[AbstractRoute, RouteMetrics] = {}
+        self._by_label: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._unmatched: Dict[str, RouteMetrics] = {}
+
+    def _for_route(self, route: AbstractRoute, method: str) -> RouteMetrics:
+        if route.resource is None:
+            # Router errors get a fresh route object per request; share by method.
+            found = self._unmatched.get(method)
+            if found is None:
+                found = self._unmatched[method] = RouteMetrics("unmatched", method)
+            return found
+        key = (_route_path(route), method)
+        found = self._by_label.get(key)
+        if found is None:
+            found = self._by_label[key] = RouteMetrics(*key)
+        self._routes[route] = found
+        return found
+
+    async def register_routes(self, app: web.Application) -> None:
+        """Startup hook creating every route's series up front."""
+        for route in app.router.routes():
+            if route.method != "*":
+                self._for_route(route, route.method)
+
+    def observe(self, route: AbstractRoute, method: str, status: int, seconds: float, size: Optional[int]) -> None:
+        found = self._routes.get(route)
+        if found is None or route.method != method:
+            found = self._for_route(route, method)
+        found.latency.observe(seconds)
+        if size is not None:
+            found.size.observe(size)
+        found.status_classes[min(status // 100, 5)] += 1
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        routes: List[RouteMetrics] = list(self._by_label.values()) + list(self._unmatched.values())
+        lines = [
+            "# HELP aplus_request_duration_seconds Total handler time per route and method.",
+            "# TYPE aplus_request_duration_seconds histogram",
+        ]
+        for route in routes:
+            lines.extend(route.latency.lines("aplus_request_duration_seconds", route.labels))
+        lines += [
+            "# HELP aplus_response_size_bytes Response body size per route and method.",
+            "# TYPE aplus_response_size_bytes histogram",
+        ]
+        for route in routes:
+            lines.extend(route.size.lines("aplus_response_size_bytes", route.labels))
+        lines += [
+            "# HELP aplus_responses_total Responses per route, method and status class.",
+            "# TYPE aplus_responses_total counter",
+        ]
+        for route in routes:
+            for status_class, count in enumerate(route.status_classes):
+                if count:
+                    lines.append(f'aplus_responses_total{{{route.labels},code="{status_class}xx"}} {count}')
+        lines += [
+            "# HELP aplus_handler_phase_seconds Lookup and render time inside handlers.",
+            "# TYPE aplus_handler_phase_seconds histogram",
+        ]
+        for (handler, phase), histogram in self.phases.items():
+            lines.extend(histogram.lines("aplus_handler_phase_seconds", f'handler="{handler}",phase="{phase}"'))
+        lines += [
+            "# HELP aplus_submissions_total Attendance code submissions by outcome.",
+            "# TYPE aplus_submissions_total counter",
+        ]
+        lines.extend(f'aplus_submissions_total{{outcome="{name}"}} {count}' for name, count in self.submissions.items())
+        lines += [
+            "# HELP aplus_requests_in_flight Requests currently being handled.",
+            "# TYPE aplus_requests_in_flight gauge",
+            f"aplus_requests_in_flight {self.in_flight}",
+        ]
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+@web.middleware
+async def metrics_middleware(request: web.Request, handler):
+    metrics: Metrics = request.app["metrics"]
+    metrics.in_flight += 1
+    started = time.perf_counter()
+    status = 500
+    size: Optional[int] = None
+    try:
+        response = await handler(request)
+        status = response.status
+        size = response.content_length
+        return response
+    except web.HTTPException as exc:
+        status = exc.status
+        raise
+    finally:
+        metrics.in_flight -= 1
+        metrics.observe(request.match_info.route, request.method, status, time.perf_counter() - started, size)
@@ -0,0 +1,60 @@
+"""LRU cache of rendered pages keyed by model version."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+from weakref import WeakValueDictionary
+
+
+class CachedPage:
+    """A rendered body, its strong ETag and compressed variants made on demand."""
+
+    __slots__ = ("body", "etag", "encoded", "__weakref__")
+
+    def __init__(self, body: bytes, etag: str) -> None:
+        self.body = body
+        self.etag = etag
+        self.encoded: Dict[str, bytes] = {}
+
+
+class PageCache:
+    """Bounded LRU of rendered page bodies and their strong ETags.
+
+    Keys should include the model version, so a state change makes older
+    entries unreachable and they age out of the LRU. A miss that renders the
+    same bytes as a page still cached shares that page, compressed variants
+    included, so a version bump that did not change a page costs a render
+    and a hash but no compression.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._pages: "OrderedDict[Hashable, CachedPage]" = OrderedDict()
+        self._by_etag: "WeakValueDictionary[str, CachedPage]" = WeakValueDictionary()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> CachedPage:
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+        self.misses += 1
+        body = render()
+        etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        page = self._by_etag.get(etag)
+        if page is None:
+            page = self._by_etag[etag] = CachedPage(body, etag)
+        self._pages[key] = page
+        if len(self._pages) > self.maxsize:
+            self._pages.popitem(last=False)
+        return page
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self._pages)
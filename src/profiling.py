@@ -0,0 +1,238 @@
+"""On-demand profiling of live requests, enabled with ``--profile``.
+
+A session is started through ``POST /mock/profile/start`` and covers the next
+``requests`` matching requests (optionally only those for one ``route``).
+``mode=cprofile`` runs :mod:`cProfile` while a matching request is in its
+handler and yields pstats; ``mode=sample`` has a background thread sample
+the event loop thread's stack and yields collapsed stacks for flame graphs.
+Without ``--profile`` neither the middleware nor the routes are installed.
+
+Both modes see the whole event loop, not one request: whatever runs on the
+loop while a matching request is in its handler, including other requests
+resumed during its awaits, is counted as well. For stats of the route alone,
+profile with no other traffic or with a client concurrency of 1.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+MODES = ("cprofile", "sample")
+_PROFILE_PREFIX = "/mock/profile"
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{code.co_firstlineno}"
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.active = False
+        self.mode = "cprofile"
+        self.route: Optional[str] = None
+        self.remaining = 0
+        self.profiled = 0
+        self.interval = 0.001
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self._depth = 0
+        self._profile: Optional[cProfile.Profile] = None
+        self._samples: Counter = Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._target_thread = 0
+        self._stop_sampling = threading.Event()
+        self._switch_interval = 0.0
+
+    def start(self, *, mode: str, requests: int, route: Optional[str], interval: float) -> None:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        self.stop()
+        self.mode = mode
+        self.route = route.lower() if route else None
+        self.remaining = requests
+        self.profiled = 0
+        self.interval = interval
+        self.started_at, self.stopped_at = time.time(), 0.0
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._samples = Counter()
+        if mode == "sample":
+            self._target_thread = threading.get_ident()
+            # The sampler only runs when the loop thread hands over the GIL,
+            # so shorten the switch interval to match the sampling rate.
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, interval))
+            self._stop_sampling.clear()
+            self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+            self._sampler.start()
+        self.active = True
+
+    def stop(self) -> None:
+        if not self.active:
+            return
+        self.active = False
+        self.stopped_at = time.time()
+        if self._profile is not None and self._depth:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+            sys.setswitchinterval(self._switch_interval)
+
+    @property
+    def busy(self) -> bool:
+        """Whether a profiled request is still inside its handler."""
+        return self._depth > 0
+
+    def matches(self, request: web.Request) -> bool:
+        path = request.path.lower()
+        if path.startswith(_PROFILE_PREFIX):
+            return False
+        return self.route is None or path == self.route
+
+    def enter(self) -> None:
+        self._depth += 1
+        if self._depth == 1 and self._profile is not None:
+            self._profile.enable()
+
+    def exit(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._profile is not None:
+            self._profile.disable()
+        if not self.active:
+            return
+        self.profiled += 1
+        if self.remaining:
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.stop()
+
+    def _sample(self) -> None:
+        while not self._stop_sampling.wait(self.interval):
+            if not self._depth:
+                continue
+            frame = sys._current_frames().get(self._target_thread)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "active": self.active,
+            "mode": self.mode,
+            "route": self.route,
+            "remaining": self.remaining,
+            "profiled_requests": self.profiled,
+            "samples": sum(self._samples.values()),
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+        }
+
+    def pstats_bytes(self) -> bytes:
+        """The session's stats in the marshal format read by :class:`pstats.Stats`."""
+        if self._profile is None:
+            raise LookupError("no cProfile session has run")
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)  # type: ignore[attr-defined]
+
+    def text(self, limit: int = 50) -> str:
+        if self._profile is None:
+            raise LookupError("no cProfile session has run")
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def collapsed(self) -> str:
+        if self.mode != "sample" or self._profile is not None:
+            raise LookupError("no sampling session has run")
+        return "".join(f"{stack} {count}\n" for stack, count in self._samples.most_common())
+
+
+@web.middleware
+async def profile_middleware(request: web.Request, handler):
+    profiler: Profiler = request.app["profiler"]
+    if not profiler.active or not profiler.matches(request):
+        return await handler(request)
+    profiler.enter()
+    try:
+        return await handler(request)
+    finally:
+        profiler.exit()
+
+
+async def profile_status_handler(request: web.Request) -> web.Response:
+    return web.json_response(request.app["profiler"].status())
+
+
+async def profile_start_handler(request: web.Request) -> web.Response:
+    """Start a session: ``?mode=cprofile|sample&requests=N&route=/student/Units.aspx&interval=0.001``."""
+    profiler: Profiler = request.app["profiler"]
+    query = request.query
+    if profiler.busy:
+        raise web.HTTPConflict(text="A profiled request is still running")
+    try:
+        profiler.start(
+            mode=query.get("mode", "cprofile"),
+            requests=int(query.get("requests", "100")),
+            route=query.get("route"),
+            interval=float(query.get("interval", "0.001")),
+        )
+    except ValueError as exc:
+        raise web.HTTPBadRequest(text=str(exc))
+    return web.json_response(profiler.status())
+
+
+async def profile_stop_handler(request: web.Request) -> web.Response:
+    profiler: Profiler = request.app["profiler"]
+    profiler.stop()
+    return web.json_response(profiler.status())
+
+
+async def profile_stats_handler(request: web.Request) -> web.Response:
+    """Download the last session as ``?format=pstats`` (default), ``text`` or ``collapsed``."""
+    profiler: Profiler = request.app["profiler"]
+    fmt = request.query.get("format", "pstats" if profiler.mode == "cprofile" else "collapsed")
+    if profiler.active:
+        raise web.HTTPConflict(text="Stop the profiling session first")
+    try:
+        if fmt == "pstats":
+            return web.Response(
+                body=profiler.pstats_bytes(),
+                content_type="application/octet-stream",
+                headers={"Content-Disposition": 'attachment; filename="aplus.pstats"'},
+            )
+        if fmt == "text":
+            return web.Response(text=profiler.text())
+        if fmt == "collapsed":
+            return web.Response(
+                text=profiler.collapsed(),
+                headers={"Content-Disposition": 'attachment; filename="aplus.collapsed"'},
+            )
+    except LookupError as exc:
+        raise web.HTTPNotFound(text=str(exc))
+    raise web.HTTPBadRequest(text="format must be pstats, text or collapsed")
+
+
+def install_profiling(app: web.Application) -> None:
+    app["profiler"] = Profiler()
+    app.add_routes(
+        [
+            web.get(_PROFILE_PREFIX, profile_status_handler),
+            web.post(f"{_PROFILE_PREFIX}/start", profile_start_handler),
+            web.post(f"{_PROFILE_PREFIX}/stop", profile_stop_handler),
+            web.get(f"{_PROFILE_PREFIX}/stats", profile_stats_handler),
+        ]
+    )
@@ -0,0 +1,115 @@
+"""Traffic recording for replay with ``benchmarks.replay``, enabled with ``--record``.
+
+Each request becomes one compact JSON line, written in arrival order::
+
+    {"t":1730000000.1234,"m":"POST","p":"/student/Entry.aspx","q":"s=1&d=D0","k":"bot","f":[["code","X"]]}
+
+``t`` is the arrival time, ``q`` the raw query string, ``k`` the tenant from
+the header or cookie, ``f`` the form fields as pairs and ``b`` any other
+request body as text; empty fields are left out. Lines are buffered and
+appended by a background task off the event loop without ``fsync``, since a
+recording is a sample of traffic rather than state. ``/mock/metrics`` and
+``/mock/profile`` are never recorded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from aiohttp import web
+
+from .tenants import TENANT_COOKIE, TENANT_HEADER
+
+FORM_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+_SKIPPED_PREFIXES = ("/mock/metrics", "/mock/profile")
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class TrafficRecorder:
+    def __init__(self, path: Path, *, flush_interval: float = 0.25, max_buffered: int = 4096) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.recorded = 0
+        self._buffer: List[str] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._file: Optional[BinaryIO] = None
+
+    async def record(self, request: web.Request) -> None:
+        record = {"t": round(time.time(), 4), "m": request.method, "p": request.path}
+        if request.query_string:
+            record["q"] = request.query_string
+        tenant = request.headers.get(TENANT_HEADER) or request.cookies.get(TENANT_COOKIE)
+        if tenant:
+            record["k"] = tenant
+        if request.body_exists:
+            # Both are cached on the request, so the handler reads them again for free.
+            if request.content_type in FORM_TYPES:
+                form = await request.post()
+                record["f"] = [[name, value] for name, value in form.items() if isinstance(value, str)]
+            else:
+                record["b"] = await request.text()
+        self._buffer.append(_encode(record))
+        self.recorded += 1
+        assert self._wakeup is not None, "TrafficRecorder.start() has not run"
+        self._wakeup.set()
+
+    async def start(self, app: web.Application) -> None:
+        # Unbuffered append: each flush is a single write, so workers sharing
+        # the file interleave whole batches of lines, never partial lines.
+        self._file = open(self.path, "ab", buffering=0)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self, app: web.Application) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self._buffer) < self.max_buffered:
+                # Let a burst collect into one write.
+                await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        buffer, self._buffer = self._buffer, []
+        if buffer:
+            data = ("\n".join(buffer) + "\n").encode("utf-8")
+            await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        assert self._file is not None
+        self._file.write(data)
+
+
+@web.middleware
+async def record_middleware(request: web.Request, handler):
+    if not request.path.startswith(_SKIPPED_PREFIXES):
+        await request.app["recorder"].record(request)
+    return await handler(request)
+
+
+def install_recording(app: web.Application, path: Path) -> TrafficRecorder:
+    recorder = TrafficRecorder(path)
+    app["recorder"] = recorder
+    app.on_startup.append(recorder.start)
+    app.on_cleanup.append(recorder.close)
+    return recorder
@@ -0,0 +1,208 @@
+"""Hot reload of the dataset file with incremental diff application.
+
+:class:`DatasetWatcher` polls ``data_path``'s mtime and size; when they move
+it hashes the file and, only if the content really changed, parses it off the
+event loop. :func:`merge_model` then diffs the result against the live model
+by ``session_id`` and builds the model to install from the new days, reusing
+the live :class:`Day` and :class:`Entry` objects wherever they are unchanged.
+That lets the units page keep unchanged day panels and tenants keep their
+changes to unaffected sessions (see ``reload_model`` in the server).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from aiohttp import web
+
+from .data_loader import CompactDay, Day, Entry, Model, load_model
+
+_entry_fields = attrgetter("course_code", "slot_label", "time_label", "status", "code")
+_entry_key = attrgetter("session_id", "course_code", "slot_label", "time_label", "status", "code")
+_CHUNK = 1 << 20
+
+
+class ModelDiff(NamedTuple):
+    added: Set[str]
+    removed: Set[str]
+    changed: Set[str]
+    # Days of the new model that could not reuse a live day as-is.
+    days_rebuilt: int
+    # Whether days were added, dropped or reordered.
+    layout_changed: bool
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.days_rebuilt or self.layout_changed)
+
+    def sessions(self) -> Set[str]:
+        return self.added | self.removed | self.changed
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "days_rebuilt": self.days_rebuilt,
+            "layout_changed": int(self.layout_changed),
+        }
+
+
+def _same_day(live: Day, loaded: Day) -> bool:
+    if live.label != loaded.label or live.week != loaded.week or len(live.entries) != len(loaded.entries):
+        return False
+    return list(map(_entry_key, live.entries)) == list(map(_entry_key, loaded.entries))
+
+
+def merge_model(live: Model, loaded: Model) -> Tuple[Model, ModelDiff]:
+    """Diff ``loaded`` against ``live`` and build the model to install.
+
+    The result has ``loaded``'s days in order. Days identical to a live day
+    with the same anchor are the live objects themselves; other days are
+    rebuilt, reusing live entries whose fields did not change. Only entries
+    of days that differ are compared one by one. Returns ``live`` itself if
+    nothing changed.
+    """
+    live_store, loaded_store = live.store, loaded.store
+    added = loaded_store.session_ids() - live_store.session_ids()
+    removed = live_store.session_ids() - loaded_store.session_ids()
+    live_days: Dict[str, Day] = {}
+    for day in live_store.days:
+        live_days.setdefault(day.anchor, day)
+    day_cls = CompactDay if live.compact else Day
+    days: List[Day] = []
+    candidates: Set[str] = set()
+    rebuilt = 0
+    for day in loaded_store.days:
+        previous = live_days.pop(day.anchor, None)
+        if previous is not None and _same_day(previous, day):
+            days.append(previous)
+            continue
+        rebuilt += 1
+        entries: List[Entry] = []
+        for entry in day.entries:
+            found = live_store.get(entry.session_id)
+            if found is not None and _entry_fields(found[1]) == _entry_fields(entry):
+                entries.append(found[1])
+            else:
+                entries.append(entry)
+                candidates.add(entry.session_id)
+        days.append(day_cls(anchor=day.anchor, label=day.label, entries=entries, week=day.week))
+    changed = set()
+    for session_id in candidates - added:
+        live_entry, loaded_entry = live_store.get(session_id), loaded_store.get(session_id)
+        if live_entry is not None and loaded_entry is not None:
+            if _entry_fields(live_entry[1]) != _entry_fields(loaded_entry[1]):
+                changed.add(session_id)
+    layout_changed = [day.anchor for day in days] != [day.anchor for day in live.store.days]
+    diff = ModelDiff(set(added), set(removed), changed, rebuilt, layout_changed)
+    if diff.empty:
+        return live, diff
+    return Model(days=days, compact=live.compact), diff
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DatasetWatcher:
+    """Polls the dataset file and hands each changed version to ``apply``.
+
+    Create it before the dataset is loaded so a write racing the initial load
+    is still noticed. A change of mtime or size alone (``touch``, a copy of
+    the same file) costs a hash and nothing more.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        load_options: Dict[str, Any],
+        apply: Callable[[Model], Awaitable[ModelDiff]],
+        *,
+        poll_interval: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.load_options = load_options
+        self.apply = apply
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.last_diff: Optional[ModelDiff] = None
+        self._signature = _signature(path)
+        self._digest: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _baseline(self) -> None:
+        signature = _signature(self.path)
+        if signature is not None and signature == self._signature:
+            digest = file_digest(self.path)
+            # Only trust the digest if the file did not move while hashing.
+            if _signature(self.path) == signature:
+                self._digest = digest
+
+    def read_changed(self) -> Optional[Model]:
+        """Parse the file if its content changed since the last successful read."""
+        signature = _signature(self.path)
+        if signature is None or signature == self._signature:
+            return None
+        digest = file_digest(self.path)
+        if digest == self._digest:
+            self._signature = signature
+            return None
+        try:
+            model = load_model(self.path, **self.load_options)
+            # Build every deferred day here rather than on the event loop.
+            for _ in model.store.entries():
+                pass
+        except (OSError, ValueError, KeyError):
+            # Half-written; the signature is not recorded, so the next poll
+            # tries again.
+            return None
+        self._signature, self._digest = signature, digest
+        return model
+
+    async def poll(self) -> Optional[ModelDiff]:
+        """Check once; returns the applied diff if the dataset changed."""
+        model = await asyncio.get_running_loop().run_in_executor(None, self.read_changed)
+        if model is None:
+            return None
+        diff = await self.apply(model)
+        if not diff.empty:
+            self.reloads += 1
+            self.last_diff = diff
+        return diff
+
+    async def start(self, app: web.Application) -> None:
+        if self.poll_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def close(self, app: web.Application) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._baseline)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self.poll()
@@ -0,0 +1,176 @@
+"""Case-insensitive routing for the student portal pages.
+
+The real portal answers ``/Student/...`` in any casing. Rather than register
+each page once per casing, :class:`StudentRoutes` is a single router resource
+holding a table from case-folded path to :class:`StudentPage`, so every
+casing resolves with one dict lookup. Pages carry the canonical path, which
+labels their metrics and is what their ``<base href>`` points at; the base
+href is built once per page and host rather than per request. Static folders
+are mounted as subtrees whose prefix is case-folded but whose file names are
+matched as sent.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from aiohttp import hdrs, web
+from aiohttp.web_urldispatcher import AbstractResource, ResourceRoute, UrlMappingMatchInfo
+from yarl import URL
+
+# Distinct (scheme, host) pairs a page keeps base hrefs for; Host is client
+# supplied, so the cache is reset rather than allowed to grow.
+MAX_BASE_HREFS = 64
+
+
+class StudentPage(AbstractResource):
+    """One canonical page; resolved only through its :class:`StudentRoutes` table."""
+
+    def __init__(self, path: str, *, subtree: bool = False) -> None:
+        super().__init__()
+        self._path = path
+        self._subtree = subtree
+        self._routes: Dict[str, ResourceRoute] = {}
+        self.allowed_methods: Set[str] = set()
+        self._base_hrefs: Dict[Tuple[str, str], str] = {}
+
+    @property
+    def canonical(self) -> str:
+        return self._path + "{path}" if self._subtree else self._path
+
+    def url_for(self, **kwargs: str) -> URL:
+        return URL.build(path=self._path + kwargs.get("path", "") if self._subtree else self._path)
+
+    async def resolve(self, request: web.Request):
+        return None, set()
+
+    def add_prefix(self, prefix: str) -> None:
+        raise RuntimeError("Student pages cannot be mounted in a sub-application")
+
+    def get_info(self) -> Dict[str, str]:
+        return {"prefix" if self._subtree else "path": self._path}
+
+    def raw_match(self, path: str) -> bool:
+        return path.lower() == self._path.lower()
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __iter__(self) -> Iterator[ResourceRoute]:
+        return iter(self._routes.values())
+
+    def add_route(self, method: str, handler) -> ResourceRoute:
+        method = method.upper()
+        if method in self._routes:
+            raise RuntimeError(f"{method} {self._path} is already registered")
+        route = self._routes[method] = ResourceRoute(method, handler, self)
+        self.allowed_methods.add(method)
+        return route
+
+    def route_for(self, method: str) -> Optional[ResourceRoute]:
+        return self._routes.get(method)
+
+    def base_href(self, request: web.Request) -> str:
+        """This page's absolute canonical URL as reached through the request's host."""
+        key = (request.scheme, request.host)
+        found = self._base_hrefs.get(key)
+        if found is None:
+            if len(self._base_hrefs) >= MAX_BASE_HREFS:
+                self._base_hrefs.clear()
+            found = self._base_hrefs[key] = str(request.url.with_path(self._path).with_query(None))
+        return found
+
+
+class StudentRoutes(AbstractResource):
+    """Router resource dispatching every casing of ``root`` pages from one table."""
+
+    def __init__(self, root: str = "/Student") -> None:
+        super().__init__()
+        self.root = root
+        self._pages: Dict[str, StudentPage] = {}
+        self._subtrees: Dict[str, StudentPage] = {}
+        self._subtree_splits = root.count("/") + 2
+
+    @property
+    def canonical(self) -> str:
+        # Index under "/" so the router tries this table for every casing.
+        return "/{path:(?i)" + self.root.strip("/") + "(/.*)?}"
+
+    def url_for(self, **kwargs: str) -> URL:
+        return URL.build(path=self.root + "/")
+
+    def add_prefix(self, prefix: str) -> None:
+        raise RuntimeError("Student routes cannot be mounted in a sub-application")
+
+    def get_info(self) -> Dict[str, str]:
+        return {"prefix": self.root}
+
+    def raw_match(self, path: str) -> bool:
+        return path.lower() in self._pages
+
+    def __len__(self) -> int:
+        return sum(len(page) for page in self.pages())
+
+    def __iter__(self) -> Iterator[ResourceRoute]:
+        for page in self.pages():
+            yield from page
+
+    def pages(self) -> Iterator[StudentPage]:
+        yield from self._pages.values()
+        yield from self._subtrees.values()
+
+    def _check(self, path: str) -> None:
+        if path.lower() != self.root.lower() and not path.lower().startswith(self.root.lower() + "/"):
+            raise ValueError(f"{path!r} is not under {self.root!r}")
+
+    def add_route(self, method: str, path: str, handler) -> ResourceRoute:
+        """Serve ``path`` in any casing; ``GET`` also answers ``HEAD``."""
+        self._check(path)
+        page = self._pages.get(path.lower())
+        if page is None:
+            page = self._pages[path.lower()] = StudentPage(path)
+        return self._add(page, method, handler)
+
+    def add_subtree(self, method: str, prefix: str, handler) -> ResourceRoute:
+        """Serve ``prefix`` + any non-empty rest, passed as ``match_info["path"]``.
+
+        ``prefix`` must be ``root`` plus one folder and a trailing slash.
+        """
+        self._check(prefix)
+        if not prefix.endswith("/") or prefix.count("/") != self._subtree_splits:
+            raise ValueError(f"{prefix!r} must be one folder below {self.root!r} with a trailing slash")
+        key = prefix.lower()
+        page = self._subtrees.get(key)
+        if page is None:
+            page = self._subtrees[key] = StudentPage(prefix, subtree=True)
+        return self._add(page, method, handler)
+
+    @staticmethod
+    def _add(page: StudentPage, method: str, handler) -> ResourceRoute:
+        route = page.add_route(method, handler)
+        if method.upper() == hdrs.METH_GET and page.route_for(hdrs.METH_HEAD) is None:
+            page.add_route(hdrs.METH_HEAD, handler)
+        return route
+
+    async def resolve(self, request: web.Request):
+        path = request.rel_url.path
+        match_dict: Dict[str, str] = {}
+        page = self._pages.get(path.lower())
+        if page is None:
+            # Subtrees sit exactly one folder below root: split right after it.
+            parts = path.split("/", self._subtree_splits)
+            if len(parts) <= self._subtree_splits or not parts[-1]:
+                return None, set()
+            page = self._subtrees.get(path[: len(path) - len(parts[-1])].lower())
+            if page is None:
+                return None, set()
+            match_dict["path"] = parts[-1]
+        route = page.route_for(request.method)
+        if route is None:
+            return None, page.allowed_methods
+        return UrlMappingMatchInfo(match_dict, route), page.allowed_methods
+
+
+def student_base_href(request: web.Request) -> str:
+    """The matched student page's canonical URL, for its ``<base href>``."""
+    return request.match_info.route.resource.base_href(request)
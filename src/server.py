@@ -3,32 +3,225 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+from collections import Counter
+from itertools import repeat
 from pathlib import Path
-from typing import Optional
-
-from aiohttp import web
-
-from . import PACKAGE_ROOT
-from .data_loader import Model, day_groups, find_entry, load_model
-from .templates import render_entry_page, render_units_page
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import hdrs, web
+
+from . import PACKAGE_ROOT, generator
+from .api import ApiIndex, StaleCursor, page_size
+from .binary_format import convert
+from .codes_db import CodesDB
+from .compression import MIN_COMPRESS_SIZE, cached_compress, choose_encoding, compress
+from .data_loader import Day, Entry, Model, StatusOverlay, day_views, load_model
+from .journal import Journal
+from .latency import LatencyEmulator, install_latency, latency_middleware
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import Metrics, metrics_middleware
+from .page_cache import CachedPage, PageCache
+from .profiling import install_profiling, profile_middleware
+from .recorder import install_recording, record_middleware
+from .reloader import DatasetWatcher, ModelDiff, merge_model
+from .routing import StudentRoutes, student_base_href
+from .shared_state import SharedStatusOverlay, SharedStatusTable
+from .static_assets import install_static
+from .tenants import DEFAULT_TENANT, TENANT_COOKIE, TENANT_HEADER, TenantRegistry
+from .templates import UnitsPage, render_entry_page_bytes
 
 STATIC_ROOT = PACKAGE_ROOT.parent / "static"
 DEFAULT_JSON = PACKAGE_ROOT.parent / "mock_units.json"
+DEFAULT_CODES = PACKAGE_ROOT.parent / "data"
+MAX_BATCH = 10_000
+
+
+def html_response(body: bytes, content_type: str = "text/html") -> web.Response:
+    return web.Response(body=body, content_type=content_type, charset="utf-8")
 
 
-def normalized_student_base_href(request: web.Request) -> str:
-    base_href = str(request.url.with_query(None))
-    if "/student/" in base_href:
-        base_href = base_href.replace("/student/", "/Student/", 1)
-    return base_href
+def encoded_html_response(
+    request: web.Request,
+    body: bytes,
+    variants: Optional[Dict[str, bytes]] = None,
+    content_type: str = "text/html",
+) -> Tuple[web.Response, Optional[str]]:
+    """Serve ``body`` gzip/deflate-compressed if the client accepts it and it is large enough.
+
+    Compressed bodies are kept in ``variants`` (a cached page's store) so a
+    hot page is compressed once. Returns the response and the coding used.
+    The API serves JSON through here too, with ``content_type``.
+    """
+    encoding = choose_encoding(request.headers.get(hdrs.ACCEPT_ENCODING), len(body))
+    if encoding is None:
+        response = html_response(body, content_type)
+    else:
+        data = cached_compress(variants, body, encoding) if variants is not None else compress(body, encoding)
+        response = html_response(data, content_type)
+        response.headers[hdrs.CONTENT_ENCODING] = encoding
+    if len(body) >= MIN_COMPRESS_SIZE:
+        response.headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+    return response, encoding
+
+
+def conditional_html_response(request: web.Request, page: CachedPage, content_type: str = "text/html") -> web.Response:
+    """Serve ``page`` with its ETag, or a bodyless 304 if the client has it.
+
+    Compressed representations get the coding appended to the ETag, as each
+    is a different byte sequence; any of them revalidates the page. A 304
+    carries the ETag and ``Vary`` the 200 for this request would have had.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match and any(tag.value.partition("-")[0] in (page.etag, "*") for tag in if_none_match):
+        encoding = choose_encoding(request.headers.get(hdrs.ACCEPT_ENCODING), len(page.body))
+        headers = {hdrs.ETAG: f'"{page.etag}-{encoding}"' if encoding else f'"{page.etag}"'}
+        if len(page.body) >= MIN_COMPRESS_SIZE:
+            headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+        return web.Response(status=304, headers=headers)
+    response, encoding = encoded_html_response(request, page.body, page.encoded, content_type)
+    response.headers[hdrs.ETAG] = f'"{page.etag}-{encoding}"' if encoding else f'"{page.etag}"'
+    return response
+
+
+def install_model(app: web.Application, model: Model, *, keep_tenants: bool = False) -> None:
+    """Make ``model`` live and rebuild the render plans that depend on it.
+
+    The new model's version continues from the one it replaces so cached
+    pages and ETags from before the swap are never served again. All tenants
+    start over on the new model, unless ``keep_tenants`` is set by
+    :func:`reload_model`, which moves them over itself; the units page then
+    also keeps the rendered panels of days the reload did not touch.
+    """
+    previous: Optional[Model] = app.get("model")
+    if previous is not None:
+        model.version = previous.version + 1
+    units_page = UnitsPage(day_views(model), app["units_page"] if keep_tenants else None)
+    app["model"] = model
+    app["units_page"] = units_page
+    app["api_index"] = ApiIndex(model)
+    if keep_tenants:
+        return
+    table: Optional[SharedStatusTable] = app.get("shared_status")
+    default = SharedStatusOverlay(model, table) if table is not None else None
+    app["tenants"] = TenantRegistry(model, app["max_tenants"], default=default)
+    journal: Optional[Journal] = app.get("journal")
+    if journal is not None:
+        journal.attach(app["tenants"])
+
+
+async def reload_model(app: web.Application, loaded: Model) -> ModelDiff:
+    """Apply a re-read dataset to the live one as a diff by session id.
+
+    Tenants keep their changes to every session the reload left alone, and
+    only the units page panels of changed days are rendered again. Building
+    deferred live days and the diff both run off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    live: Model = app["model"]
+    merged, diff = await loop.run_in_executor(None, merge_model, live, loaded)
+    while app["model"] is not live:
+        # Replaced by a ?reload=1 reset meanwhile: diff against that instead.
+        live = app["model"]
+        merged, diff = await loop.run_in_executor(None, merge_model, live, loaded)
+    if diff.empty:
+        return diff
+    install_model(app, merged, keep_tenants=True)
+    tenants: TenantRegistry = app["tenants"]
+    dropped = tenants.rebase(merged, diff.sessions())
+    units_page: UnitsPage = app["units_page"]
+    for _, tenant in tenants.items():
+        units_page.carry_fragments(tenant)
+    journal: Optional[Journal] = app.get("journal")
+    if journal is not None:
+        # Journal the dropped changes as reverts so a replay agrees.
+        store = merged.store
+        for tenant_key, session_ids in dropped.items():
+            reverts = []
+            for session_id in session_ids:
+                found = store.get(session_id)
+                if found is not None:
+                    reverts.append((session_id, found[1].status))
+            await journal.record_many(tenant_key, reverts)
+    return diff
+
+
+@web.middleware
+async def shared_status_middleware(request: web.Request, handler):
+    """Pull other workers' status changes into this process before handling.
+
+    Only the default tenant lives in shared memory, so requests that name
+    another tenant, or change the latency config of just this worker, are
+    refused rather than answered from one worker's private state.
+    """
+    tenant_key = request_tenant_key(request)
+    if request.path == "/mock/reset":
+        tenant_key = request.query.get("tenant") or tenant_key
+        if tenant_key == "*":
+            tenant_key = DEFAULT_TENANT
+    if tenant_key != DEFAULT_TENANT:
+        raise web.HTTPBadRequest(text="Named tenants are not available with --workers; run a single worker")
+    if request.method == "POST" and request.path == "/mock/config":
+        raise web.HTTPBadRequest(text="With --workers the latency config can only be set with --latency-config")
+    request.app["tenants"].default.sync()
+    return await handler(request)
+
+
+def request_tenant_key(request: web.Request) -> str:
+    return request.headers.get(TENANT_HEADER) or request.cookies.get(TENANT_COOKIE) or DEFAULT_TENANT
+
+
+def request_tenant(request: web.Request) -> Tuple[str, StatusOverlay]:
+    """Resolve the caller's tenant from the header or cookie, creating it on first use."""
+    key = request_tenant_key(request)
+    return key, request.app["tenants"].get(key)
+
+
+def expected_code(app: web.Application, day: Day, entry: Entry) -> str:
+    """The code ``entry`` accepts: from the codes tree if it has one, else the dataset's.
+
+    The tree is read for the day's own ``week`` if the dataset gives one, else
+    for ``--codes-week`` or the unit's latest week.
+    """
+    codes: Optional[CodesDB] = app.get("codes")
+    if codes is not None:
+        week = getattr(day, "week", None) or app["codes_week"]
+        code = codes.code_for(entry.course_code, entry.slot_label, week)
+        if code is not None:
+            return code
+    return entry.code
+
+
+def check_submission(app: web.Application, day: Day, entry: Entry, status: str, code: str) -> str:
+    """Outcome of submitting ``code`` for an entry whose current status is ``status``.
+
+    One of ``ok``, ``invalid``, ``locked`` or ``already_submitted``; only
+    ``ok`` changes anything.
+    """
+    if status == "submitted":
+        return "already_submitted"
+    if status == "locked":
+        return "locked"
+    if expected_code(app, day, entry).strip().upper() == (code or "").strip().upper():
+        return "ok"
+    return "invalid"
 
 
 async def units_handler(request: web.Request) -> web.Response:
     model: Model = request.app["model"]
-    groups = day_groups(model)
-    base_href = normalized_student_base_href(request)
-    html = render_units_page(groups, base_href=base_href)
-    return web.Response(text=html, content_type="text/html")
+    units_page: UnitsPage = request.app["units_page"]
+    tenant_key, tenant = request_tenant(request)
+    base_href = student_base_href(request)
+    render_time = request.app["metrics"].phases["units", "render"]
+    page = request.app["page_cache"].get_or_render(
+        ("units", tenant_key, model.version, tenant.version, base_href),
+        lambda: render_time.timed(units_page.render, base_href, tenant),
+    )
+    return conditional_html_response(request, page)
 
 
 async def entry_handler(request: web.Request) -> web.Response:
@@ -37,64 +230,253 @@ async def entry_handler(request: web.Request) -> web.Response:
     if not session_id:
         raise web.HTTPBadRequest(text="Missing session id")
     model: Model = request.app["model"]
+    metrics: Metrics = request.app["metrics"]
     message: Optional[str] = None
     error = False
 
+    lookup = metrics.phases["entry", "lookup"]
+    found = None
+    if day_anchor:
+        # A session id listed on several days resolves to the linked day's copy.
+        found = lookup.timed(model.store.get_in_day, day_anchor, session_id)
+    if found is None:
+        found = lookup.timed(model.store.get, session_id)
+    if found is None:
+        raise web.HTTPNotFound(text="Session not found")
+    day, entry = found
+    tenant_key, tenant = request_tenant(request)
+    status = tenant.status_of(entry)
+
     if request.method == "POST":
         form = await request.post()
         code = form.get("ctl00$ContentPlaceHolder1$txtAttendanceCode", "")
-        found = find_entry(model, session_id)
-        if found is None:
-            raise web.HTTPNotFound(text="Session not found")
-        _, entry = found
-        ok = False
-        if entry.status == "submitted":
-            ok = True
-        elif entry.status == "locked":
-            ok = False
-        else:
-            ok = entry.code.strip().upper() == (code or "").strip().upper()
-            if ok:
-                entry.status = "submitted"
-        if ok:
+        outcome = check_submission(request.app, day, entry, status, str(code))
+        metrics.submissions[outcome] += 1
+        if outcome == "ok":
+            if tenant.set_status(session_id, "submitted") and "journal" in request.app:
+                await request.app["journal"].record(tenant_key, session_id, "submitted")
+            status = "submitted"
+        if outcome in ("ok", "already_submitted"):
             message = "Code submitted successfully."
         else:
             message = "Invalid code. Please try again."
             error = True
 
-    found = find_entry(model, session_id)
-    if found is None:
+    base_href = student_base_href(request)
+    render_time = metrics.phases["entry", "render"]
+    if message is not None:
+        body = render_time.timed(
+            render_entry_page_bytes,
+            entry,
+            base_href=base_href,
+            day_anchor=day_anchor,
+            message=message,
+            error=error,
+            status=status,
+        )
+        return encoded_html_response(request, body)[0]
+    page = request.app["page_cache"].get_or_render(
+        ("entry", tenant_key, model.version, tenant.version, base_href, session_id, day_anchor),
+        lambda: render_time.timed(
+            render_entry_page_bytes, entry, base_href=base_href, day_anchor=day_anchor, status=status
+        ),
+    )
+    return conditional_html_response(request, page)
+
+
+def api_response(request: web.Request, key: Tuple, render) -> web.Response:
+    page = request.app["page_cache"].get_or_render(("api",) + key, render)
+    return conditional_html_response(request, page, "application/json")
+
+
+async def api_courses_handler(request: web.Request) -> web.Response:
+    """``/mock/api/courses``: the course codes that AttendanceInfo.aspx lists."""
+    api: ApiIndex = request.app["api_index"]
+    return api_response(request, ("courses", request.app["model"].version), api.courses)
+
+
+async def api_days_handler(request: web.Request) -> web.Response:
+    """``/mock/api/days?limit=&cursor=``: days with their sizes, in dataset order."""
+    api: ApiIndex = request.app["api_index"]
+    cursor = request.query.get("cursor")
+    try:
+        limit = page_size(request.query.get("limit"))
+        return api_response(
+            request,
+            ("days", request.app["model"].version, cursor, limit),
+            lambda: api.days(cursor=cursor, limit=limit),
+        )
+    except StaleCursor as exc:
+        raise web.HTTPGone(text=str(exc))
+    except ValueError as exc:
+        raise web.HTTPBadRequest(text=str(exc))
+
+
+async def api_entries_handler(request: web.Request) -> web.Response:
+    """``/mock/api/entries?day=&course=&limit=&cursor=``: entries with the caller's statuses."""
+    model: Model = request.app["model"]
+    api: ApiIndex = request.app["api_index"]
+    query = request.query
+    day, course, cursor = query.get("day"), query.get("course"), query.get("cursor")
+    if day is not None and not api.has_day(day):
+        raise web.HTTPNotFound(text="Day not found")
+    if course is not None and not api.has_course(course):
+        raise web.HTTPNotFound(text="Course not found")
+    tenant_key, tenant = request_tenant(request)
+    try:
+        limit = page_size(query.get("limit"))
+        return api_response(
+            request,
+            ("entries", tenant_key, model.version, tenant.version, day, course, cursor, limit),
+            lambda: api.entries(tenant, day=day, course=course, cursor=cursor, limit=limit),
+        )
+    except StaleCursor as exc:
+        raise web.HTTPGone(text=str(exc))
+    except ValueError as exc:
+        raise web.HTTPBadRequest(text=str(exc))
+
+
+async def api_entry_handler(request: web.Request) -> web.Response:
+    """``/mock/api/entries/{session_id}``: one entry and the caller's status for it."""
+    _, tenant = request_tenant(request)
+    body = request.app["api_index"].entry(tenant, request.match_info["session_id"])
+    if body is None:
         raise web.HTTPNotFound(text="Session not found")
-    _, entry = found
-    entry_map = {
-        "course_code": entry.course_code,
-        "slot_label": entry.slot_label,
-        "time_label": entry.time_label,
-        "status": entry.status,
-    }
-    base_href = normalized_student_base_href(request)
-    html = render_entry_page(entry_map, base_href=base_href, day_anchor=day_anchor, message=message, error=error)
-    return web.Response(text=html, content_type="text/html")
+    return html_response(body, "application/json")
+
+
+async def batch_submit_handler(request: web.Request) -> web.Response:
+    """Submit many codes at once for the caller's tenant.
+
+    The body is ``[[session_id, code], ...]`` (objects with ``session_id`` and
+    ``code`` also work, optionally wrapped as ``{"items": [...]}``). Items are
+    checked with the same rules as Entry.aspx and applied in order, so a
+    repeated session reports ``already_submitted``. The response lists one
+    outcome per item, ``not_found`` and ``malformed`` included, plus totals.
+    """
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Expected a JSON body")
+    items = payload.get("items") if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise web.HTTPBadRequest(text="Expected a list of [session_id, code] pairs")
+    if len(items) > MAX_BATCH:
+        return web.json_response(
+            {"error": f"A batch holds at most {MAX_BATCH} items, got {len(items)}"},
+            status=413,
+        )
+    store = request.app["model"].store
+    metrics: Metrics = request.app["metrics"]
+    tenant_key, tenant = request_tenant(request)
+    outcomes: List[str] = []
+    changed: List[str] = []
+    for item in items:
+        if isinstance(item, dict):
+            session_id, code = item.get("session_id"), item.get("code")
+        elif isinstance(item, list) and len(item) == 2:
+            session_id, code = item
+        else:
+            session_id = code = None
+        if not isinstance(session_id, str) or not isinstance(code, str):
+            outcomes.append("malformed")
+            continue
+        found = store.get(session_id)
+        if found is None:
+            outcomes.append("not_found")
+            continue
+        day, entry = found
+        outcome = check_submission(request.app, day, entry, tenant.status_of(entry), code)
+        metrics.submissions[outcome] += 1
+        if outcome == "ok" and tenant.set_status(session_id, "submitted"):
+            changed.append(session_id)
+        outcomes.append(outcome)
+    if changed and "journal" in request.app:
+        await request.app["journal"].record_many(tenant_key, zip(changed, repeat("submitted")))
+    return web.json_response({"results": outcomes, "counts": dict(Counter(outcomes))})
 
 
 async def reset_handler(request: web.Request) -> web.Response:
-    data_path: Path = request.app["data_path"]
-    request.app["model"] = load_model(data_path)
+    """Reset one tenant (``?tenant=``, header or cookie) or, by default, everything.
+
+    The loaded dataset is never modified, so a full reset (no tenant, or
+    ``?tenant=*``) only drops the tenants' status overlays. ``?reload=1``
+    re-reads the dataset from disk instead (not in ``--workers`` mode).
+    """
+    tenant_key = request.query.get("tenant") or request.headers.get(TENANT_HEADER)
+    tenant_key = tenant_key or request.cookies.get(TENANT_COOKIE)
+    tenants: TenantRegistry = request.app["tenants"]
+    journal: Optional[Journal] = request.app.get("journal")
+    if tenant_key and tenant_key != "*":
+        tenants.reset(tenant_key)
+        if journal is not None:
+            await journal.record_reset(tenant_key)
+        return web.json_response({"status": "ok", "tenant": tenant_key})
+    if request.query.get("reload") and request.app.get("shared_status") is None:
+        data_path: Path = request.app["data_path"]
+        install_model(request.app, load_model(data_path, **request.app["load_options"]))
+    else:
+        tenants.reset_all()
+        request.app["model"].version += 1
+    if journal is not None:
+        await journal.record_reset()
     return web.json_response({"status": "ok"})
 
 
+async def codes_handler(request: web.Request) -> web.Response:
+    """Return the ``{slot, code}`` records of one unit's week from the codes tree."""
+    codes: Optional[CodesDB] = request.app.get("codes")
+    unit, week = request.match_info["unit"], request.match_info["week"]
+    records = codes.codes(unit, week) if codes is not None else None
+    if records is None:
+        raise web.HTTPNotFound(text=f"No codes for {unit} week {week}")
+    return web.json_response({"unit": unit.upper(), "week": week, "codes": records})
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    metrics: Metrics = request.app["metrics"]
+    page_cache: PageCache = request.app["page_cache"]
+    extra = [
+        "# HELP aplus_page_cache_lookups_total Rendered page cache lookups by result.",
+        "# TYPE aplus_page_cache_lookups_total counter",
+        f'aplus_page_cache_lookups_total{{result="hit"}} {page_cache.hits}',
+        f'aplus_page_cache_lookups_total{{result="miss"}} {page_cache.misses}',
+        "# HELP aplus_model_version Bumped on every status change, reset and reload.",
+        "# TYPE aplus_model_version gauge",
+        f"aplus_model_version {request.app['model'].version}",
+    ]
+    watcher: Optional[DatasetWatcher] = request.app.get("data_watcher")
+    if watcher is not None:
+        extra += [
+            "# HELP aplus_dataset_reloads_total Dataset file changes applied by the watcher.",
+            "# TYPE aplus_dataset_reloads_total counter",
+            f"aplus_dataset_reloads_total {watcher.reloads}",
+        ]
+    latency: LatencyEmulator = request.app["latency"]
+    if latency.enabled:
+        extra += [
+            "# HELP aplus_emulated_rejections_total Requests refused by the latency emulation limits.",
+            "# TYPE aplus_emulated_rejections_total counter",
+        ]
+        extra += [
+            f'aplus_emulated_rejections_total{{reason="{reason}"}} {count}'
+            for reason, count in latency.rejection_totals().items()
+        ]
+    return web.Response(body=metrics.render(extra).encode("utf-8"), headers={hdrs.CONTENT_TYPE: METRICS_CONTENT_TYPE})
+
+
 async def attendance_info_handler(request: web.Request) -> web.Response:
     """Handler for /student/AttendanceInfo.aspx - returns enrolled course codes."""
     model: Model = request.app["model"]
+    page = request.app["page_cache"].get_or_render(
+        ("info", model.version),
+        lambda: render_attendance_info(model.store.course_codes()),
+    )
+    return conditional_html_response(request, page)
 
-    # Extract unique course codes from the model
-    course_codes = set()
-    for day in model.days:
-        for entry in day.entries:
-            course_codes.add(entry.course_code)
 
+def render_attendance_info(course_codes_list: List[str]) -> bytes:
     # Create a simple HTML page with course codes that submit.py can scrape
-    course_codes_list = sorted(list(course_codes))
     html = f"""<!DOCTYPE html>
 <html>
 <head>
@@ -107,18 +489,92 @@ async def attendance_info_handler(request: web.Request) -> web.Response:
     </div>
 </body>
 </html>"""
-
-    return web.Response(text=html, content_type="text/html")
-
-
-def create_app(data_path: Path = DEFAULT_JSON) -> web.Application:
-    app = web.Application()
+    return html.encode("utf-8")
+
+
+def create_app(
+    data_path: Path = DEFAULT_JSON,
+    *,
+    compact: bool = False,
+    lazy: bool = False,
+    use_mmap: bool = False,
+    page_cache_size: int = 256,
+    max_tenants: int = 1024,
+    shared_status: bool = False,
+    journal_path: Optional[Path] = None,
+    codes_path: Optional[Path] = DEFAULT_CODES,
+    codes_week: Optional[str] = None,
+    codes_poll_interval: float = 2.0,
+    data_poll_interval: float = 0,
+    profile: bool = False,
+    record_path: Optional[Path] = None,
+    latency_config: Optional[Path] = None,
+) -> web.Application:
+    """Build the portal app.
+
+    With ``shared_status=True`` the default tenant's statuses are kept in a
+    :class:`SharedStatusTable` so processes forked from this app stay in step.
+    With ``journal_path`` status changes are journaled there and replayed on
+    top of the dataset at startup. With ``codes_path`` submissions are checked
+    against the ``<UNIT>/<WEEK>.json`` codes tree there (``codes_week``, or
+    each unit's latest week), which is re-polled for new weeks. The dataset
+    itself is polled every ``data_poll_interval`` seconds if that is set (not
+    with ``shared_status``) and changes are applied with :func:`reload_model`.
+    ``profile`` adds the ``/mock/profile`` endpoints and the middleware they
+    control. ``record_path`` appends every request there for replay.
+    ``latency_config`` is the initial latency emulation config, which
+    ``/mock/config`` can replace at runtime.
+    """
+    middlewares = [metrics_middleware]
+    if record_path is not None:
+        middlewares.append(record_middleware)
+    middlewares.append(latency_middleware)
+    if shared_status:
+        middlewares.append(shared_status_middleware)
+    if profile:
+        middlewares.append(profile_middleware)
+    app = web.Application(middlewares=middlewares)
+    app["metrics"] = Metrics()
+    app.on_startup.append(app["metrics"].register_routes)
+    if profile:
+        install_profiling(app)
+    if record_path is not None:
+        install_recording(app, record_path)
+    install_latency(app, latency_config)
     app["data_path"] = data_path
-    app["model"] = load_model(data_path)
-
-    async def home_handler(request: web.Request) -> web.Response:
+    app["load_options"] = {"compact": compact, "lazy": lazy, "use_mmap": use_mmap}
+    app["page_cache"] = PageCache(page_cache_size)
+    app["max_tenants"] = max_tenants
+    if data_poll_interval > 0 and not shared_status:
+        # Created before loading so a write racing the load is still seen.
+        watcher = DatasetWatcher(
+            data_path,
+            app["load_options"],
+            lambda loaded: reload_model(app, loaded),
+            poll_interval=data_poll_interval,
+        )
+        app["data_watcher"] = watcher
+        app.on_startup.append(watcher.start)
+        app.on_cleanup.append(watcher.close)
+    model = load_model(data_path, **app["load_options"])
+    if shared_status:
+        app["shared_status"] = SharedStatusTable.for_model(model)
+    install_model(app, model)
+    if journal_path is not None:
+        journal = Journal(journal_path)
+        journal.replay(app["tenants"])
+        app["journal"] = journal
+        app.on_startup.append(journal.start)
+        app.on_cleanup.append(journal.close)
+    app["codes_week"] = codes_week
+    if codes_path is not None:
+        codes = CodesDB(codes_path, poll_interval=codes_poll_interval)
+        app["codes"] = codes
+        app.on_startup.append(codes.start)
+        app.on_cleanup.append(codes.close)
+
+    def render_home(base_href: str) -> bytes:
         """Main student portal homepage with two main options"""
-        base_href = normalized_student_base_href(request)
         html = f"""<!DOCTYPE html>
 <html class="ui-mobile">
 <head>
@@ -160,53 +616,209 @@ def create_app(data_path: Path = DEFAULT_JSON) -> web.Application:
 </div>
 </body>
 </html>"""
-        return web.Response(text=html, content_type="text/html")
+        return html.encode("utf-8")
+
+    async def home_handler(request: web.Request) -> web.Response:
+        base_href = student_base_href(request)
+        page = request.app["page_cache"].get_or_render(("home", base_href), lambda: render_home(base_href))
+        return conditional_html_response(request, page)
 
     async def redirect_to_student(request: web.Request) -> web.Response:
         raise web.HTTPFound("/student/")
 
+    # Student pages answer in any casing through one table (see routing.py).
+    student = StudentRoutes("/Student")
+    app.router.register_resource(student)
+    student.add_route(hdrs.METH_GET, "/Student", redirect_to_student)
+    student.add_route(hdrs.METH_GET, "/Student/", home_handler)
+    student.add_route(hdrs.METH_GET, "/Student/Default.aspx", home_handler)
+    student.add_route(hdrs.METH_GET, "/Student/Units.aspx", units_handler)
+    student.add_route(hdrs.METH_GET, "/Student/Entry.aspx", entry_handler)
+    student.add_route(hdrs.METH_POST, "/Student/Entry.aspx", entry_handler)
+    student.add_route(hdrs.METH_GET, "/Student/AttendanceInfo.aspx", attendance_info_handler)
     app.add_routes(
         [
             web.get("/", redirect_to_student),
-            web.get("/student/", home_handler),
-            web.get("/student", redirect_to_student),
-            web.get("/Student/", home_handler),
-            web.get("/Student", redirect_to_student),
-            web.get("/student/Units.aspx", units_handler),
-            web.get("/Student/Units.aspx", units_handler),
-            web.get("/student/Entry.aspx", entry_handler),
-            web.get("/Student/Entry.aspx", entry_handler),
-            web.post("/student/Entry.aspx", entry_handler),
-            web.post("/Student/Entry.aspx", entry_handler),
-            web.get("/student/AttendanceInfo.aspx", attendance_info_handler),
-            web.get("/Student/AttendanceInfo.aspx", attendance_info_handler),
-            web.get("/student/Default.aspx", home_handler),
-            web.get("/Student/Default.aspx", home_handler),
             web.post("/mock/reset", reset_handler),
+            web.post("/mock/submit", batch_submit_handler),
+            web.get("/mock/codes/{unit}/{week}", codes_handler),
+            web.get("/mock/metrics", metrics_handler),
+            web.get("/mock/api/courses", api_courses_handler),
+            web.get("/mock/api/days", api_days_handler),
+            web.get("/mock/api/entries", api_entries_handler),
+            web.get("/mock/api/entries/{session_id}", api_entry_handler),
         ]
     )
 
     if STATIC_ROOT.exists():
-        for prefix in ("student", "Student"):
-            base = f"/{prefix}"
-            app.router.add_static(f"{base}/jq/", str(STATIC_ROOT / "jq"))
-            app.router.add_static(f"{base}/jqm/", str(STATIC_ROOT / "jqm"))
-            app.router.add_static(f"{base}/img/", str(STATIC_ROOT / "img"))
-        app.router.add_static("/static/", str(STATIC_ROOT), show_index=True)
+        install_static(app, STATIC_ROOT, student)
     else:
         raise FileNotFoundError(f"Missing static assets at {STATIC_ROOT}")
     return app
 
 
+def run_workers(app: web.Application, *, host: str, port: int, workers: int) -> None:
+    """Fork ``workers`` processes that each serve ``app`` on one SO_REUSEPORT port."""
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                web.run_app(app, host=host, port=port, reuse_port=True, print=None)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    print(f"======== Running on http://{host}:{port} with {workers} workers ========")
+
+    def stop_children(signum: int, frame: object) -> None:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop_children)
+    signal.signal(signal.SIGTERM, stop_children)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def convert_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.server convert",
+        description="Convert a mock JSON dataset to the binary format accepted by --data.",
+    )
+    parser.add_argument("source", type=Path, help="JSON dataset to read")
+    parser.add_argument("target", type=Path, help="Binary dataset to write")
+    args = parser.parse_args(argv)
+    days, entries = convert(args.source, args.target)
+    print(f"Wrote {days} days and {entries} entries to {args.target}")
+
+
 def main(argv: Optional[list[str]] = None) -> None:
-    parser = argparse.ArgumentParser(description="Run the APLUS mock portal server.")
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "convert":
+        convert_main(argv[1:])
+        return
+    if argv and argv[0] == "generate":
+        generator.main(argv[1:])
+        return
+    parser = argparse.ArgumentParser(
+        description="Run the APLUS mock portal server.",
+        epilog=(
+            "Use 'convert SOURCE TARGET' to turn a JSON dataset into the binary format,"
+            " or 'generate OUTPUT' to write a synthetic dataset."
+        ),
+    )
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8080)
-    parser.add_argument("--data", type=Path, default=DEFAULT_JSON, help="Path to mock JSON dataset")
+    parser.add_argument("--data", type=Path, default=DEFAULT_JSON, help="Path to mock JSON or binary dataset")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use slotted, string-interned records for large datasets",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Stream the dataset and build each day's entries on first use",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Read the dataset through a memory map (implies --lazy)",
+    )
+    parser.add_argument(
+        "--page-cache-size",
+        type=int,
+        default=256,
+        help="Maximum rendered pages kept for ETag/304 responses",
+    )
+    parser.add_argument(
+        "--max-tenants",
+        type=int,
+        default=1024,
+        help="Per-client tenants kept before the least recently used is evicted",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes sharing the port and the default tenant's statuses",
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        default=None,
+        help="Append status changes to this file and replay it on startup",
+    )
+    parser.add_argument(
+        "--codes",
+        type=Path,
+        default=DEFAULT_CODES,
+        help="Directory of <UNIT>/<WEEK>.json attendance codes checked on submission",
+    )
+    parser.add_argument(
+        "--codes-week",
+        default=None,
+        help="Week whose codes are accepted (default: each unit's latest week)",
+    )
+    parser.add_argument(
+        "--codes-poll",
+        type=float,
+        default=2.0,
+        help="Seconds between scans for new week files (0 disables watching)",
+    )
+    parser.add_argument(
+        "--data-poll",
+        type=float,
+        default=0,
+        help="Seconds between checks of --data for changes to apply live (default 0: off)",
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        help="Append every request to this JSONL file for benchmarks.replay",
+    )
+    parser.add_argument(
+        "--latency-config",
+        type=Path,
+        default=None,
+        help="JSON latency, concurrency and rate limit emulation config (see /mock/config)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Enable the /mock/profile endpoints for cProfile or sampling sessions",
+    )
     args = parser.parse_args(argv)
-
-    app = create_app(args.data)
-    web.run_app(app, host=args.host, port=args.port)
+    if args.workers > 1 and not (hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")):
+        parser.error("--workers needs a platform with fork() and SO_REUSEPORT")
+    if args.workers > 1 and args.journal is not None:
+        parser.error("--journal cannot be combined with --workers")
+
+    app = create_app(
+        args.data,
+        compact=args.compact,
+        lazy=args.lazy,
+        use_mmap=args.mmap,
+        page_cache_size=args.page_cache_size,
+        max_tenants=args.max_tenants,
+        shared_status=args.workers > 1,
+        journal_path=args.journal,
+        codes_path=args.codes,
+        codes_week=args.codes_week,
+        codes_poll_interval=args.codes_poll,
+        data_poll_interval=args.data_poll,
+        profile=args.profile,
+        record_path=args.record,
+        latency_config=args.latency_config,
+    )
+    if args.workers > 1:
+        run_workers(app, host=args.host, port=args.port, workers=args.workers)
+    else:
+        web.run_app(app, host=args.host, port=args.port)
 
 
 if __name__ == "__main__":
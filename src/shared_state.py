@@ -0,0 +1,118 @@
+"""Attendance statuses shared between forked worker processes.
+
+The default tenant's statuses live in an anonymous shared mapping created
+before the workers fork: one status byte per session index, a change counter
+and a ring of recently changed indexes. Sessions no worker has changed hold
+:data:`UNCHANGED` and read the model's own status, so the table is sized from
+the session index without building deferred days. Each worker applies the ring to its
+local :class:`StatusOverlay` before handling a request, so render caches are
+invalidated per entry rather than rebuilt.
+"""
+
+from __future__ import annotations
+
+import mmap
+import multiprocessing
+import re
+import struct
+from typing import List, Optional, Tuple
+
+from .data_loader import STATUS_NAMES, Model, StatusOverlay, status_code
+
+RING_SIZE = 4096
+_HEADER = struct.Struct("<QQ")  # version, epoch
+_RING_OFFSET = _HEADER.size
+_STATUS_OFFSET = _RING_OFFSET + RING_SIZE * 4
+# Status byte of a session still at the model's status.
+UNCHANGED = 0xFF
+_CHANGED = re.compile(b"[^\xff]")
+
+
+class SharedStatusTable:
+    """Status bytes indexed by :meth:`SessionStore.index_of`, shared across forks."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._buf = mmap.mmap(-1, _STATUS_OFFSET + max(1, size))
+        self._ring = memoryview(self._buf)[_RING_OFFSET:_STATUS_OFFSET].cast("I")
+        self._statuses = memoryview(self._buf)[_STATUS_OFFSET : _STATUS_OFFSET + size]
+        self._statuses[:] = bytes([UNCHANGED]) * size
+        self._lock = multiprocessing.Lock()
+
+    @classmethod
+    def for_model(cls, model: Model) -> "SharedStatusTable":
+        return cls(len(model.store))
+
+    def counters(self) -> Tuple[int, int]:
+        """Current ``(version, epoch)``; cheap enough to read on every request."""
+        return _HEADER.unpack_from(self._buf, 0)
+
+    def get(self, index: int) -> int:
+        return self._statuses[index]
+
+    def set(self, index: int, code: int) -> None:
+        with self._lock:
+            version, epoch = _HEADER.unpack_from(self._buf, 0)
+            self._statuses[index] = code
+            self._ring[version % RING_SIZE] = index
+            _HEADER.pack_into(self._buf, 0, version + 1, epoch)
+
+    def reset(self) -> None:
+        """Mark every session unchanged and make every worker resync."""
+        with self._lock:
+            version, epoch = _HEADER.unpack_from(self._buf, 0)
+            self._statuses[:] = bytes([UNCHANGED]) * self._size
+            _HEADER.pack_into(self._buf, 0, version + 1, epoch + 1)
+
+    def changed(self) -> List[int]:
+        """Indexes of every session some worker has set."""
+        return [match.start() for match in _CHANGED.finditer(self._statuses)]
+
+    def changes_since(self, version: int, epoch: int) -> Tuple[int, int, Optional[List[int]]]:
+        """Indexes changed since ``(version, epoch)``, or ``None`` if a full resync is needed."""
+        now_version, now_epoch = _HEADER.unpack_from(self._buf, 0)
+        if now_epoch != epoch or now_version - version > RING_SIZE // 2:
+            return now_version, now_epoch, None
+        return now_version, now_epoch, [self._ring[v % RING_SIZE] for v in range(version, now_version)]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class SharedStatusOverlay(StatusOverlay):
+    """Default-tenant overlay that publishes changes to a :class:`SharedStatusTable`."""
+
+    __slots__ = ("table", "synced_version", "synced_epoch")
+
+    def __init__(self, model: Model, table: SharedStatusTable) -> None:
+        super().__init__(model)
+        self.table = table
+        self.synced_version, self.synced_epoch = table.counters()
+
+    def set_status(self, session_id: str, status: str) -> bool:
+        changed = super().set_status(session_id, status)
+        index = self.model.store.index_of(session_id)
+        if changed and index is not None:
+            self.table.set(index, status_code(status))
+        return changed
+
+    def clear(self) -> None:
+        self.table.reset()
+        super().clear()
+
+    def sync(self) -> None:
+        """Apply changes other workers made since the last sync."""
+        version, epoch = self.table.counters()
+        if version == self.synced_version and epoch == self.synced_epoch:
+            return
+        version, epoch, changed = self.table.changes_since(self.synced_version, self.synced_epoch)
+        if changed is None:
+            StatusOverlay.clear(self)
+            changed = self.table.changed()
+        store = self.model.store
+        for index in changed:
+            code = self.table.get(index)
+            # A reset racing this sync bumps the epoch; the next sync clears.
+            if code != UNCHANGED:
+                StatusOverlay.set_status(self, store.session_at(index), STATUS_NAMES[code])
+        self.synced_version, self.synced_epoch = version, epoch
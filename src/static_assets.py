@@ -0,0 +1,149 @@
+"""Static assets served from memory with precomputed compressed variants.
+
+Every file under the static root is read once at startup. Text assets also
+get gzip and, if the optional ``brotli`` package is installed, brotli
+variants, each kept only when it is meaningfully smaller. Responses pick the
+best variant the client accepts and carry a content-hash ETag and a
+long-lived ``Cache-Control``. All route aliases share one :class:`StaticCache`.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import html
+import mimetypes
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from aiohttp import hdrs, web
+
+from .compression import accepted_encodings
+from .routing import StudentRoutes
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+CACHE_CONTROL = "public, max-age=31536000"
+# Keep a compressed variant only if it saves at least this fraction.
+MIN_SAVING = 0.1
+# Quality 11 costs about ten times as long at startup for ~7% smaller output.
+BROTLI_QUALITY = 9
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+class StaticAsset(NamedTuple):
+    content_type: str
+    etag: str
+    # (content-encoding, body) pairs, best first; identity is always last.
+    variants: Tuple[Tuple[str, bytes], ...]
+
+
+def _compressed_variants(body: bytes) -> List[Tuple[str, bytes]]:
+    variants = []
+    candidates = [("gzip", gzip.compress(body, 9, mtime=0))]
+    if brotli is not None:
+        candidates.insert(0, ("br", brotli.compress(body, quality=BROTLI_QUALITY)))
+    for encoding, compressed in candidates:
+        if len(compressed) <= len(body) * (1 - MIN_SAVING):
+            variants.append((encoding, compressed))
+    return variants
+
+
+class StaticCache:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+        self.directories: Dict[str, List[str]] = {"": []}
+        self.bytes_identity = 0
+        self.bytes_compressed = 0
+        for path in sorted(p for p in root.rglob("*") if p.is_file()):
+            self._load(path.relative_to(root).as_posix(), path.read_bytes())
+
+    def _load(self, name: str, body: bytes) -> None:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        variants: List[Tuple[str, bytes]] = []
+        if content_type.startswith(_COMPRESSIBLE):
+            variants = _compressed_variants(body)
+        variants.append(("identity", body))
+        etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.assets[name] = StaticAsset(content_type, etag, tuple(variants))
+        self.bytes_identity += len(body)
+        self.bytes_compressed += len(variants[0][1])
+        parent, _, _ = name.rpartition("/")
+        child = name
+        while True:
+            self.directories.setdefault(parent, [])
+            entry = child[len(parent) + 1 :] if parent else child
+            if entry not in self.directories[parent]:
+                self.directories[parent].append(entry)
+            if not parent:
+                break
+            child, parent = parent, parent.rpartition("/")[0]
+
+    def response(self, request: web.Request, name: str) -> web.StreamResponse:
+        asset = self.assets.get(name)
+        if asset is None:
+            return self._directory_listing(request, name.rstrip("/"))
+        encoding, body = asset.variants[-1]
+        if len(asset.variants) > 1:
+            accepted = accepted_encodings(request.headers.get(hdrs.ACCEPT_ENCODING, ""))
+            for candidate, candidate_body in asset.variants:
+                if candidate in accepted:
+                    encoding, body = candidate, candidate_body
+                    break
+        # Each coding is its own byte sequence, so it gets its own strong
+        # ETag, as for pages (see server.conditional_html_response).
+        etag = asset.etag if encoding == "identity" else f"{asset.etag}-{encoding}"
+        headers = {
+            hdrs.ETAG: f'"{etag}"',
+            hdrs.CACHE_CONTROL: CACHE_CONTROL,
+            hdrs.VARY: hdrs.ACCEPT_ENCODING,
+        }
+        if_none_match = request.if_none_match
+        if if_none_match and any(tag.value in (etag, "*") for tag in if_none_match):
+            return web.Response(status=304, headers=headers)
+        if encoding != "identity":
+            headers[hdrs.CONTENT_ENCODING] = encoding
+        headers[hdrs.CONTENT_TYPE] = asset.content_type
+        return web.Response(body=body, headers=headers)
+
+    def _directory_listing(self, request: web.Request, name: str) -> web.Response:
+        entries = self.directories.get(name)
+        if entries is None:
+            raise web.HTTPNotFound()
+        base = request.path if request.path.endswith("/") else request.path + "/"
+        links = "".join(
+            f'<li><a href="{html.escape(base + entry, quote=True)}">{html.escape(entry)}</a></li>\n'
+            for entry in entries
+        )
+        title = html.escape(f"Index of {request.path}")
+        return web.Response(
+            text=f"<html><head><title>{title}</title></head><body><h1>{title}</h1><ul>\n{links}</ul></body></html>",
+            content_type="text/html",
+        )
+
+
+def static_handler(prefix: str, *, listing: bool = False):
+    """Handler serving ``prefix`` + the ``path`` match from the app's :class:`StaticCache`."""
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        name = prefix + request.match_info.get("path", "")
+        cache: StaticCache = request.app["static_cache"]
+        if not listing and name not in cache.assets:
+            raise web.HTTPNotFound()
+        return cache.response(request, name)
+
+    return handler
+
+
+def install_static(app: web.Application, root: Path, student: StudentRoutes) -> StaticCache:
+    """Serve ``jq/``, ``jqm/`` and ``img/`` under the student root (any casing), plus ``/static/``."""
+    cache = StaticCache(root)
+    app["static_cache"] = cache
+    for folder in ("jq", "jqm", "img"):
+        student.add_subtree(hdrs.METH_GET, f"{student.root}/{folder}/", static_handler(f"{folder}/"))
+    app.router.add_get("/static/{path:.*}", static_handler("", listing=True))
+    return cache
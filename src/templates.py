@@ -1,96 +1,74 @@
-"""HTML rendering helpers for the mock attendance portal."""
+"""HTML rendering helpers for the mock attendance portal.
+
+Page sources are compiled once at import into constant byte segments and named
+slots, and :class:`UnitsPage` pre-escapes the immutable parts of a dataset once
+per model load and caches rendered entry and day fragments, so a request only
+fills the dynamic slots and joins bytes.
+"""
 
 from __future__ import annotations
 
+import string
+from functools import lru_cache
 from html import escape
-from typing import Iterable, Mapping, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
+if TYPE_CHECKING:
+    from .data_loader import StatusOverlay
 
-def render_units_page(
-    day_groups: Iterable[Mapping[str, object]],
-    *,
-    base_href: str,
-) -> str:
-    groups = [dict(group) for group in day_groups]
-    if not groups:
-        groups = [{"anchor": "0", "label": "No sessions available", "entries": []}]
-
-    selected_anchor = str(groups[0]["anchor"])
-
-    option_lines = []
-    for group in groups:
-        anchor = str(group["anchor"])
-        label = str(group["label"])
-        selected = ' selected="selected"' if anchor == selected_anchor else ""
-        option_lines.append(
-            f'            <option value="{escape(anchor)}"{selected}>{escape(label)}</option>'
-        )
-    options_html = "\n".join(option_lines)
-
-    panel_blocks = []
-    for group in groups:
-        anchor = str(group["anchor"])
-        style_attr = "" if anchor == selected_anchor else ' style="display:none;"'
-        entries = [dict(entry) for entry in group.get("entries", [])]
-        entry_lines = [
-            f'    <div class="dayPanel" id="dayPanel_{escape(anchor)}"{style_attr}>'
-        ]
-        if not entries:
-            entry_lines.append('        <div class="noticeMessage">Nothing on this day</div>')
-        else:
-            entry_lines.append(
-                '        <ul data-role="listview" data-inset="true" class="ui-listview ui-listview-inset ui-corner-all ui-shadow">'
-            )
-            for idx, entry in enumerate(entries):
-                entry = dict(entry)
-                classes = ["ui-li-has-icon"]
-                if idx == 0:
-                    classes.append("ui-first-child")
-                if idx == len(entries) - 1:
-                    classes.append("ui-last-child")
-                status = str(entry.get("status", "pending"))
-                status_key = status.lower()
-                icon = "tick.png" if status_key == "submitted" else "question.png"
-                time_label = escape(str(entry["time_label"]))
-                slot_text = f'{escape(str(entry["course_code"]))} {escape(str(entry["slot_label"]))}'
-                status_label = {
-                    "submitted": "Submitted",
-                    "locked": "Closed",
-                    "pending": "Open",
-                }.get(status_key, status.replace("_", " ").title())
-                status_class = {
-                    "submitted": "status-submitted",
-                    "locked": "status-locked",
-                    "pending": "status-open",
-                }.get(status_key, "status-open")
-                status_html = f'<span class="status-tag {status_class}">{escape(status_label)}</span>'
-                if status_key == "submitted":
-                    li_classes = classes + ["ui-li-static", "ui-body-inherit"]
-                    li_class_str = " ".join(li_classes)
-                    entry_lines.append(
-                        f'            <li class="{li_class_str}"><img class="ui-li-icon" src="./img/{icon}">{time_label} {slot_text}{status_html}</li>'
-                    )
-                elif status_key == "locked":
-                    li_classes = classes + ["ui-disabled", "ui-li-static", "ui-body-inherit"]
-                    li_class_str = " ".join(li_classes)
-                    entry_lines.append(
-                        f'            <li class="{li_class_str}"><img class="ui-li-icon" src="./img/{icon}">{time_label} {slot_text}{status_html}</li>'
-                    )
-                else:
-                    href = f'Entry.aspx?s={escape(str(entry["session_id"]))}&d={escape(anchor)}'
-                    classes_str = " ".join(classes)
-                    entry_lines.append(
-                        f'            <li class="{classes_str}"><a href="{href}" onclick="$.mobile.loading(\'show\');" class="ui-btn ui-btn-icon-right ui-icon-carat-r"><img class="ui-li-icon" src="./img/{icon}">{time_label} {slot_text}{status_html}</a></li>'
-                    )
-            entry_lines.append("        </ul>")
-        entry_lines.append("    </div>")
-        panel_blocks.append("\n".join(entry_lines))
-    panels_html = "\n".join(panel_blocks)
-
-    return f"""<!DOCTYPE html>
+SlotValue = Union[bytes, Sequence[bytes]]
+
+
+class CompiledTemplate:
+    """A page source split into constant byte segments around ``{name}`` slots.
+
+    The source uses :meth:`str.format` syntax, so literal braces are written
+    as ``{{`` and ``}}``.
+    """
+
+    __slots__ = ("segments", "slots")
+
+    def __init__(self, source: str) -> None:
+        segments: List[bytes] = []
+        slots: List[str] = []
+        literal: List[str] = []
+        for text, field_name, _, _ in string.Formatter().parse(source):
+            literal.append(text)
+            if field_name is not None:
+                segments.append("".join(literal).encode("utf-8"))
+                slots.append(field_name)
+                literal = []
+        segments.append("".join(literal).encode("utf-8"))
+        self.segments: Tuple[bytes, ...] = tuple(segments)
+        self.slots: Tuple[str, ...] = tuple(slots)
+
+    def render(self, values: Mapping[str, SlotValue]) -> bytes:
+        """Join segments and slot values; a slot may hold a list of byte chunks."""
+        parts: List[bytes] = [self.segments[0]]
+        for name, segment in zip(self.slots, self.segments[1:]):
+            value = values[name]
+            if isinstance(value, bytes):
+                parts.append(value)
+            else:
+                parts.extend(value)
+            parts.append(segment)
+        return b"".join(parts)
+
+
+def _esc(value: object) -> bytes:
+    return escape(str(value)).encode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _escaped_base_href(base_href: str) -> bytes:
+    return _esc(base_href)
+
+
+_UNITS_TEMPLATE = CompiledTemplate(
+    """<!DOCTYPE html>
 <html class="ui-mobile">
 <head>
-    <base href="{escape(base_href)}">
+    <base href="{base_href}">
     <title>Choose day and activity</title>
     <meta name="viewport" content="width=device-width, initial-scale=1,maximum-scale=1, user-scalable=no">
     <link rel="stylesheet" href="./jqm/monash.min.css">
@@ -180,7 +158,7 @@ def render_units_page(
             <div style="margin-bottom:8px; font-weight:bold;">Select a day</div>
             <div data-role="fieldcontain" class="ui-field-contain">
                 <select id="daySel" data-native-menu="false">
-{options_html}
+{options}
                 </select>
             </div>
         </div>
@@ -220,7 +198,7 @@ $(document).ready(function(){{
 }});
 </script>
 
-{panels_html}
+{panels}
 
     </div>
 
@@ -237,31 +215,13 @@ $(document).ready(function(){{
 <div class="ui-loader ui-corner-all ui-body-a ui-loader-default"><span class="ui-icon-loading"></span><h1>loading</h1></div>
 </body>
 </html>"""
+)
 
-
-def render_entry_page(
-    entry: Mapping[str, object],
-    *,
-    base_href: str,
-    day_anchor: Optional[str] = None,
-    message: Optional[str] = None,
-    error: bool = False,
-) -> str:
-    status_key = str(entry.get("status", "pending")).lower()
-    status = {
-        "pending": "Open",
-        "locked": "Closed",
-        "submitted": "Submitted",
-    }.get(status_key, status_key.replace("_", " ").title())
-    notice = ""
-    if message:
-        message_class = "message" if not error else "message error"
-        notice = f'<div class="{message_class}">{escape(message)}</div>'
-
-    return f"""<!DOCTYPE html>
+_ENTRY_TEMPLATE = CompiledTemplate(
+    """<!DOCTYPE html>
 <html class="ui-mobile">
 <head>
-    <base href="{escape(base_href)}">
+    <base href="{base_href}">
     <title>Enter code</title>
     <meta name="viewport" content="width=device-width, initial-scale=1,maximum-scale=1, user-scalable=no">
     <link rel="stylesheet" href="./jqm/monash.min.css">
@@ -287,8 +247,8 @@ def render_entry_page(
 
         <div style="margin-bottom:14px; text-align:center;">
             <div style="background-color: white; padding: 20px; margin: 20px 0; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                <div style="font-size: 20px; font-weight: bold; color: #333; margin-bottom: 10px;">{escape(str(entry['course_code']))} {escape(str(entry['slot_label']))}</div>
-                <div style="font-size: 16px; color: #666; margin-bottom: 10px;">{escape(str(entry['time_label']))}</div>
+                <div style="font-size: 20px; font-weight: bold; color: #333; margin-bottom: 10px;">{heading}</div>
+                <div style="font-size: 16px; color: #666; margin-bottom: 10px;">{time_label}</div>
                 <div style="font-size: 14px; color: #888;">Status: {status}</div>
             </div>
         </div>
@@ -303,7 +263,7 @@ def render_entry_page(
         </form>
 
         <div style="margin-top: 10px;">
-            <a href="Units.aspx{f'#{day_anchor}' if day_anchor else ''}" data-role="button" class="ui-btn ui-corner-all ui-shadow">Cancel</a>
+            <a href="Units.aspx{cancel_fragment}" data-role="button" class="ui-btn ui-corner-all ui-shadow">Cancel</a>
         </div>
 
     </div>
@@ -321,3 +281,272 @@ def render_entry_page(
 <div class="ui-loader ui-corner-all ui-body-a ui-loader-default"><span class="ui-icon-loading"></span><h1>loading</h1></div>
 </body>
 </html>"""
+)
+
+_LISTVIEW_OPEN = (
+    b'\n        <ul data-role="listview" data-inset="true" class="ui-listview ui-listview-inset ui-corner-all ui-shadow">'
+)
+
+_STATUS_LABELS = {"submitted": "Submitted", "locked": "Closed", "pending": "Open"}
+_STATUS_CLASSES = {"submitted": "status-submitted", "locked": "status-locked", "pending": "status-open"}
+
+
+@lru_cache(maxsize=256)
+def _status_tag(status: str) -> bytes:
+    status_key = status.lower()
+    label = _STATUS_LABELS.get(status_key, status.replace("_", " ").title())
+    css = _STATUS_CLASSES.get(status_key, "status-open")
+    return f'<span class="status-tag {css}">{escape(label)}</span>'.encode("utf-8")
+
+
+@lru_cache(maxsize=256)
+def _entry_status_text(status: str) -> bytes:
+    status_key = status.lower()
+    return {
+        "pending": "Open",
+        "locked": "Closed",
+        "submitted": "Submitted",
+    }.get(status_key, status_key.replace("_", " ").title()).encode("utf-8")
+
+
+@lru_cache(maxsize=4)
+def _li_open(first: bool, last: bool) -> bytes:
+    classes = ["ui-li-has-icon"]
+    if first:
+        classes.append("ui-first-child")
+    if last:
+        classes.append("ui-last-child")
+    return f'            <li class="{" ".join(classes)}'.encode("utf-8")
+
+
+class _EntryPlan:
+    """Pre-escaped pieces of one ``<li>`` plus its cached rendered fragment."""
+
+    __slots__ = ("entry", "session_id", "li_open", "body", "href_open", "fragment")
+
+    def __init__(self, entry: Mapping[str, object], anchor_html: str, li_open: bytes) -> None:
+        self.entry = entry
+        self.session_id = str(entry["session_id"])
+        self.li_open = li_open
+        # escape() works character by character, so one call covers the whole line.
+        self.body = escape(f'{entry["time_label"]} {entry["course_code"]} {entry["slot_label"]}').encode("utf-8")
+        self.href_open = (
+            f'"><a href="Entry.aspx?s={escape(self.session_id)}&d={anchor_html}" '
+            f"onclick=\"$.mobile.loading('show');\" class=\"ui-btn ui-btn-icon-right ui-icon-carat-r\">"
+        ).encode("utf-8")
+        self.fragment: Optional[bytes] = None
+
+    def render(self) -> bytes:
+        if self.fragment is None:
+            self.fragment = self.render_status(str(self.entry.get("status", "pending")))
+        return self.fragment
+
+    def render_status(self, status: str) -> bytes:
+        status_key = status.lower()
+        if status_key == "submitted":
+            opening = b' ui-li-static ui-body-inherit"><img class="ui-li-icon" src="./img/tick.png">'
+            tail = b"</li>"
+        elif status_key == "locked":
+            opening = b' ui-disabled ui-li-static ui-body-inherit"><img class="ui-li-icon" src="./img/question.png">'
+            tail = b"</li>"
+        else:
+            opening = self.href_open + b'<img class="ui-li-icon" src="./img/question.png">'
+            tail = b"</a></li>"
+        return b"".join((self.li_open, opening, self.body, _status_tag(status), tail))
+
+
+class _PanelPlan:
+    """One day panel with the model's statuses, rendered once and then reused."""
+
+    __slots__ = ("header", "entries", "fragment")
+
+    def __init__(self, header: bytes, entries: List[_EntryPlan]) -> None:
+        self.header = header
+        self.entries = entries
+        self.fragment: Optional[bytes] = None
+
+    def render(self) -> bytes:
+        if self.fragment is None:
+            self.fragment = self.render_overrides({})
+        return self.fragment
+
+    def render_overrides(self, statuses: Mapping[str, str]) -> bytes:
+        """Render with ``statuses`` taking precedence over the entries' own."""
+        parts = [self.header]
+        if not self.entries:
+            parts.append(b'\n        <div class="noticeMessage">Nothing on this day</div>')
+        else:
+            parts.append(_LISTVIEW_OPEN)
+            for plan in self.entries:
+                parts.append(b"\n")
+                status = statuses.get(plan.session_id)
+                parts.append(plan.render() if status is None else plan.render_status(status))
+            parts.append(b"\n        </ul>")
+        parts.append(b"\n    </div>")
+        return b"".join(parts)
+
+
+class UnitsPage:
+    """Render plan for the units page over a fixed list of day groups.
+
+    Anchors, labels and entry text are escaped once here. Each ``<li>`` and
+    each day panel is rendered once with the model's statuses and then reused
+    byte-for-byte; an overlay's changes re-render only the panels they touch.
+    The plan is built on first render, so lazily loaded days are not parsed
+    until then.
+
+    Given the built ``previous`` page of a reloaded dataset, day groups that
+    are the very same objects keep their panel plans and rendered fragments;
+    :attr:`reused` maps their new panel index to the old one.
+    """
+
+    def __init__(
+        self,
+        day_groups: Iterable[Mapping[str, object]],
+        previous: Optional["UnitsPage"] = None,
+    ) -> None:
+        self._groups: Optional[List[Mapping[str, object]]] = list(day_groups)
+        self.reused: Dict[int, int] = {}
+        if previous is not None and previous._groups is None:
+            self._build(previous)
+
+    def _build(self, previous: Optional["UnitsPage"] = None) -> None:
+        groups = self._groups or []
+        self._groups = None
+        if not groups:
+            groups = [{"anchor": "0", "label": "No sessions available", "entries": []}]
+        selected_anchor = str(groups[0]["anchor"])
+        previous_panels: Dict[int, Tuple[int, _PanelPlan]] = {}
+        if previous is not None:
+            previous_panels = {
+                id(group): (idx, panel) for idx, (group, panel) in enumerate(zip(previous._days, previous._panels))
+            }
+        self._days = groups
+
+        option_lines = []
+        self._panels: List[_PanelPlan] = []
+        self._by_session: Dict[str, List[Tuple[int, _EntryPlan]]] = {}
+        for group in groups:
+            anchor = str(group["anchor"])
+            anchor_html = escape(anchor)
+            selected = ' selected="selected"' if anchor == selected_anchor else ""
+            option_lines.append(
+                f'            <option value="{anchor_html}"{selected}>{escape(str(group["label"]))}</option>'
+            )
+            style_attr = "" if anchor == selected_anchor else ' style="display:none;"'
+            header = f'    <div class="dayPanel" id="dayPanel_{anchor_html}"{style_attr}>'.encode("utf-8")
+            found = previous_panels.get(id(group))
+            if found is not None and found[1].header == header:
+                self.reused[len(self._panels)] = found[0]
+                for plan in found[1].entries:
+                    self._by_session.setdefault(plan.session_id, []).append((len(self._panels), plan))
+                self._panels.append(found[1])
+                continue
+            entries = group.get("entries", [])
+            panel = _PanelPlan(header, [])
+            last = len(entries) - 1
+            for idx, entry in enumerate(entries):
+                plan = _EntryPlan(entry, anchor_html, _li_open(idx == 0, idx == last))
+                panel.entries.append(plan)
+                self._by_session.setdefault(plan.session_id, []).append((len(self._panels), plan))
+            self._panels.append(panel)
+        self._options = "\n".join(option_lines).encode("utf-8")
+        # Panel fragments interleaved with their separators; overlays patch a copy.
+        self._panel_parts: List[bytes] = []
+        for idx, panel in enumerate(self._panels):
+            if idx:
+                self._panel_parts.append(b"\n")
+            self._panel_parts.append(panel.render())
+
+    def carry_fragments(self, overlay: StatusOverlay) -> None:
+        """Keep ``overlay``'s cached panels for reused days, under their new indexes."""
+        old = overlay.fragments
+        overlay.fragments = {new: old[idx] for new, idx in self.reused.items() if idx in old}
+
+    def _render_panels(self) -> List[bytes]:
+        if self._groups is not None:
+            self._build()
+        return self._panel_parts
+
+    def _render_overlay_panels(self, overlay: StatusOverlay) -> List[bytes]:
+        if self._groups is not None:
+            self._build()
+        for session_id in overlay.dirty:
+            for panel_idx, _ in self._by_session.get(session_id, ()):
+                overlay.fragments.pop(panel_idx, None)
+        overlay.dirty.clear()
+        parts = self._render_panels()
+        if not overlay.statuses:
+            return parts
+        parts = list(parts)
+        for session_id in overlay.statuses:
+            for panel_idx, _ in self._by_session.get(session_id, ()):
+                fragment = overlay.fragments.get(panel_idx)
+                if fragment is None:
+                    fragment = self._panels[panel_idx].render_overrides(overlay.statuses)
+                    overlay.fragments[panel_idx] = fragment
+                parts[2 * panel_idx] = fragment
+        return parts
+
+    def render(self, base_href: str, overlay: Optional[StatusOverlay] = None) -> bytes:
+        """Render the page, applying ``overlay``'s statuses on top if given.
+
+        Panels without overlay changes reuse the shared fragments; changed
+        panels are cached on the overlay itself.
+        """
+        panels = self._render_panels() if overlay is None else self._render_overlay_panels(overlay)
+        return _UNITS_TEMPLATE.render(
+            {
+                "base_href": _escaped_base_href(base_href),
+                "options": self._options,
+                "panels": panels,
+            }
+        )
+
+
+def render_units_page(
+    day_groups: Iterable[Mapping[str, object]],
+    *,
+    base_href: str,
+) -> str:
+    return UnitsPage(day_groups).render(base_href).decode("utf-8")
+
+
+def render_entry_page_bytes(
+    entry: Mapping[str, object],
+    *,
+    base_href: str,
+    day_anchor: Optional[str] = None,
+    message: Optional[str] = None,
+    error: bool = False,
+    status: Optional[str] = None,
+) -> bytes:
+    """Render Entry.aspx; ``status`` overrides the entry's own status if given."""
+    if status is None:
+        status = str(entry.get("status", "pending"))
+    notice = b""
+    if message:
+        message_class = "message" if not error else "message error"
+        notice = f'<div class="{message_class}">{escape(message)}</div>'.encode("utf-8")
+    values: Dict[str, SlotValue] = {
+        "base_href": _escaped_base_href(base_href),
+        "notice": notice,
+        "heading": _esc(entry["course_code"]) + b" " + _esc(entry["slot_label"]),
+        "time_label": _esc(entry["time_label"]),
+        "status": _entry_status_text(status),
+        "cancel_fragment": f"#{day_anchor}".encode("utf-8") if day_anchor else b"",
+    }
+    return _ENTRY_TEMPLATE.render(values)
+
+
+def render_entry_page(
+    entry: Mapping[str, object],
+    *,
+    base_href: str,
+    day_anchor: Optional[str] = None,
+    message: Optional[str] = None,
+    error: bool = False,
+) -> str:
+    return render_entry_page_bytes(
+        entry, base_href=base_href, day_anchor=day_anchor, message=message, error=error
+    ).decode("utf-8")
@@ -0,0 +1,94 @@
+"""Per-client tenants sharing one loaded dataset."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .data_loader import Model, StatusOverlay
+
+DEFAULT_TENANT = "default"
+TENANT_HEADER = "X-Mock-Student"
+TENANT_COOKIE = "mock_student"
+
+
+class TenantRegistry:
+    """LRU of :class:`StatusOverlay` tenants over a shared :class:`Model`.
+
+    Tenants are created on first use in O(1) and hold only their own status
+    changes. Once more than ``max_tenants`` exist the least recently used one
+    is evicted; the default tenant is never evicted. :attr:`on_evict`, if
+    set, is called with each evicted key.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        max_tenants: int = 1024,
+        default: Optional[StatusOverlay] = None,
+    ) -> None:
+        self.model = model
+        self.max_tenants = max(2, max_tenants)
+        self.default = default if default is not None else StatusOverlay(model)
+        self._tenants: "OrderedDict[str, StatusOverlay]" = OrderedDict()
+        self.on_evict: Optional[Callable[[str], None]] = None
+
+    def get(self, key: Optional[str]) -> StatusOverlay:
+        if not key or key == DEFAULT_TENANT:
+            return self.default
+        tenant = self._tenants.get(key)
+        if tenant is not None:
+            self._tenants.move_to_end(key)
+            return tenant
+        # The default tenant counts towards the cap.
+        while self._tenants and len(self._tenants) + 2 > self.max_tenants:
+            evicted, _ = self._tenants.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+        tenant = StatusOverlay(self.model)
+        self._tenants[key] = tenant
+        return tenant
+
+    def reset(self, key: str) -> bool:
+        """Clear one tenant's changes; returns ``False`` if it does not exist."""
+        if key == DEFAULT_TENANT:
+            self.default.clear()
+            return True
+        tenant = self._tenants.get(key)
+        if tenant is None:
+            return False
+        tenant.clear()
+        return True
+
+    def reset_all(self) -> None:
+        """Clear the default tenant and drop every other tenant."""
+        self.default.clear()
+        self._tenants.clear()
+
+    def rebase(self, model: Model, sessions: Set[str]) -> Dict[str, List[str]]:
+        """Move every tenant onto a reloaded ``model``; see :meth:`StatusOverlay.rebase`.
+
+        Returns the session ids each tenant lost its changes to, by tenant.
+        """
+        self.model = model
+        dropped = {}
+        for key, tenant in self.items():
+            lost = tenant.rebase(model, sessions)
+            if lost:
+                dropped[key] = lost
+        return dropped
+
+    def items(self) -> Iterator[Tuple[str, StatusOverlay]]:
+        """All tenants, without touching their LRU position."""
+        yield DEFAULT_TENANT, self.default
+        yield from self._tenants.items()
+
+    def __contains__(self, key: object) -> bool:
+        return key == DEFAULT_TENANT or key in self._tenants
+
+    def __iter__(self) -> Iterator[str]:
+        yield DEFAULT_TENANT
+        yield from self._tenants
+
+    def __len__(self) -> int:
+        return len(self._tenants) + 1
@@ -0,0 +1,22 @@
+"""Shared fixtures: the bundled ``mock_units.json`` dataset."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src import PACKAGE_ROOT
+from src.data_loader import Model, load_model
+
+DATASET = PACKAGE_ROOT.parent / "mock_units.json"
+
+
+@pytest.fixture
+def dataset() -> Path:
+    return DATASET
+
+
+@pytest.fixture
+def model() -> Model:
+    return load_model(DATASET)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.data_loader import load_model
+from src.server import create_app, reload_model
+
+
+def _serve(path: Path, check: Callable[[TestClient], Awaitable[None]]) -> None:
+    async def run() -> None:
+        async with TestClient(TestServer(create_app(path, codes_path=None))) as client:
+            await check(client)
+
+    asyncio.run(run())
+
+
+def _copy(dataset: Path, tmp_path: Path) -> Path:
+    path = tmp_path / "units.json"
+    path.write_bytes(dataset.read_bytes())
+    return path
+
+
+def _rewrite(path: Path, edit: Callable[[dict], None]) -> None:
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    edit(payload)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _drop_session(payload: dict, session_id: str) -> None:
+    for day in payload["days"]:
+        day["entries"] = [entry for entry in day["entries"] if entry["session_id"] != session_id]
+
+
+def test_entries_pages_cover_every_entry(dataset: Path, tmp_path: Path) -> None:
+    async def check(client: TestClient) -> None:
+        seen, cursor = [], None
+        while True:
+            params = {"limit": "7", **({"cursor": cursor} if cursor else {})}
+            page = await (await client.get("/mock/api/entries", params=params)).json()
+            seen.extend(entry["session_id"] for entry in page["entries"])
+            cursor = page["next"]
+            if cursor is None:
+                break
+        assert seen == list(client.app["model"].store.session_ids())
+
+    _serve(_copy(dataset, tmp_path), check)
+
+
+def test_stale_entries_cursor_is_gone(dataset: Path, tmp_path: Path) -> None:
+    path = _copy(dataset, tmp_path)
+
+    async def check(client: TestClient) -> None:
+        for query in ("", "&day=%s" % client.app["model"].store.days[0].anchor):
+            page = await (await client.get(f"/mock/api/entries?limit=2{query}")).json()
+            last = page["entries"][-1]["session_id"]
+            _rewrite(path, lambda payload: _drop_session(payload, last))
+            await reload_model(client.app, load_model(path))
+
+            response = await client.get(f"/mock/api/entries?limit=2{query}", params={"cursor": page["next"]})
+            assert response.status == 410
+
+    _serve(path, check)
+
+
+def test_stale_days_cursor_is_gone(dataset: Path, tmp_path: Path) -> None:
+    path = _copy(dataset, tmp_path)
+
+    async def check(client: TestClient) -> None:
+        page = await (await client.get("/mock/api/days?limit=1")).json()
+        _rewrite(path, lambda payload: payload["days"].pop(0))
+        await reload_model(client.app, load_model(path))
+
+        response = await client.get("/mock/api/days", params={"limit": "1", "cursor": page["next"]})
+        assert response.status == 410
+
+    _serve(path, check)
+
+
+def test_cursor_survives_unrelated_reload(dataset: Path, tmp_path: Path) -> None:
+    path = _copy(dataset, tmp_path)
+
+    async def check(client: TestClient) -> None:
+        page = await (await client.get("/mock/api/days?limit=2")).json()
+        _rewrite(path, lambda payload: payload["days"].pop(0))
+        await reload_model(client.app, load_model(path))
+
+        response = await client.get("/mock/api/days", params={"limit": "1", "cursor": page["next"]})
+        assert response.status == 200
+        following = (await response.json())["days"]
+        assert following[0]["anchor"] == client.app["model"].store.days[1].anchor
+
+    _serve(path, check)
+
+
+def test_malformed_cursor_is_bad_request(dataset: Path, tmp_path: Path) -> None:
+    async def check(client: TestClient) -> None:
+        response = await client.get("/mock/api/entries", params={"cursor": "not a cursor"})
+        assert response.status == 400
+
+    _serve(_copy(dataset, tmp_path), check)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from src.data_loader import Model
+from src.journal import Journal, collapse
+from src.tenants import TenantRegistry
+
+
+def test_collapse_drops_torn_tail() -> None:
+    data = b"alice\t1\tsubmitted\nbob\t2\tlocked\nalice\t3\tsubm"
+    assert collapse(data) == {b"alice\t1": b"submitted", b"bob\t2": b"locked"}
+
+
+def test_collapse_keeps_last_status() -> None:
+    data = b"alice\t1\tsubmitted\nalice\t1\tlocked\nalice\t2\tsubmitted\n"
+    assert collapse(data) == {b"alice\t1": b"locked", b"alice\t2": b"submitted"}
+
+
+def test_collapse_tenant_reset_drops_only_that_tenant() -> None:
+    data = b"alice\t1\tsubmitted\nbob\t1\tlocked\nalice\t\t\nalice\t2\tlocked\n"
+    assert collapse(data) == {b"bob\t1": b"locked", b"alice\t2": b"locked"}
+
+
+def test_collapse_reset_all() -> None:
+    data = b"alice\t1\tsubmitted\nbob\t1\tlocked\n*\t\t\nbob\t2\tsubmitted\n"
+    assert collapse(data) == {b"bob\t2": b"submitted"}
+
+
+def test_collapse_reset_after_snapshot_rows() -> None:
+    # A reset's effect must not leak into statuses recorded after it.
+    data = b"alice\t1\tsubmitted\nalice\t\t\nalice\t1\tlocked\nbob\t\t\n"
+    assert collapse(data) == {b"alice\t1": b"locked"}
+
+
+def _record_then_close(path: Path, model: Model) -> None:
+    async def run() -> None:
+        journal = Journal(path)
+        journal.attach(TenantRegistry(model))
+        await journal.start(None)
+        await journal.record("alice", "564001", "submitted")
+        await journal.record_many("bob", [("564002", "locked"), ("564003", "submitted")])
+        await journal.record_reset("bob")
+        await journal.record("bob", "564004", "submitted")
+        await journal.close(None)
+
+    asyncio.run(run())
+
+
+def test_replay_ignores_torn_tail(tmp_path: Path, model: Model) -> None:
+    path = tmp_path / "statuses.journal"
+    _record_then_close(path, model)
+    with path.open("ab") as handle:
+        handle.write(b"alice\t564002\tlock")
+
+    tenants = TenantRegistry(model)
+    applied = Journal(path).replay(tenants)
+
+    assert applied == 2
+    assert tenants.get("alice").statuses == {"564001": "submitted"}
+    assert tenants.get("bob").statuses == {"564004": "submitted"}
+
+
+def test_evicted_tenant_is_not_replayed(tmp_path: Path, model: Model) -> None:
+    path = tmp_path / "statuses.journal"
+
+    async def run() -> None:
+        journal = Journal(path)
+        tenants = TenantRegistry(model, max_tenants=2)
+        journal.attach(tenants)
+        await journal.start(None)
+        tenants.get("alice").set_status("564001", "submitted")
+        await journal.record("alice", "564001", "submitted")
+        # Only one named tenant fits, so this evicts alice.
+        tenants.get("bob")
+        await journal.close(None)
+
+    asyncio.run(run())
+    tenants = TenantRegistry(model)
+    assert Journal(path).replay(tenants) == 0
+    assert tenants.get("alice").statuses == {}
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.data_loader import Model, load_model
+from src.reloader import merge_model
+from src.server import create_app, reload_model
+from src.tenants import TENANT_HEADER, TenantRegistry
+
+
+def _edit(source: Path, target: Path, session_id: str, **fields: str) -> Path:
+    payload = json.loads(source.read_text(encoding="utf-8"))
+    for day in payload["days"]:
+        for entry in day["entries"]:
+            if entry["session_id"] == session_id:
+                entry.update(fields)
+    target.write_text(json.dumps(payload), encoding="utf-8")
+    return target
+
+
+def test_merge_unchanged_returns_live(dataset: Path, model: Model) -> None:
+    merged, diff = merge_model(model, load_model(dataset))
+    assert merged is model
+    assert diff.empty
+
+
+def test_merge_reuses_unchanged_days(dataset: Path, model: Model, tmp_path: Path) -> None:
+    loaded = load_model(_edit(dataset, tmp_path / "units.json", "564002", status="locked"))
+    merged, diff = merge_model(model, loaded)
+
+    assert diff.changed == {"564002"} and not diff.added and not diff.removed
+    assert diff.days_rebuilt == 1
+    kept = [day for day in merged.store.days if any(day is live for live in model.store.days)]
+    assert len(kept) == len(model.store.days) - 1
+    # Unchanged entries of the rebuilt day are the live objects too.
+    assert merged.store.get("564001")[1] is model.store.get("564001")[1]
+    assert merged.store.get("564002")[1].status == "locked"
+
+
+def test_rebase_keeps_unrelated_tenant_statuses(dataset: Path, model: Model, tmp_path: Path) -> None:
+    tenants = TenantRegistry(model)
+    tenants.get("alice").set_status("564001", "submitted")
+    tenants.get("alice").set_status("564002", "submitted")
+    tenants.get("bob").set_status("564003", "submitted")
+
+    loaded = load_model(_edit(dataset, tmp_path / "units.json", "564002", status="locked"))
+    merged, diff = merge_model(model, loaded)
+    dropped = tenants.rebase(merged, diff.sessions())
+
+    assert dropped == {"alice": ["564002"]}
+    assert tenants.get("alice").statuses == {"564001": "submitted"}
+    assert tenants.get("bob").statuses == {"564003": "submitted"}
+    assert tenants.get("alice").status_of(merged.store.get("564002")[1]) == "locked"
+
+
+def test_reload_model_keeps_tenant_pages(dataset: Path, tmp_path: Path) -> None:
+    path = tmp_path / "units.json"
+    path.write_bytes(dataset.read_bytes())
+
+    async def run() -> None:
+        app = create_app(path, codes_path=None)
+        async with TestClient(TestServer(app)) as client:
+            app["tenants"].get("alice").set_status("564001", "submitted")
+            headers = {TENANT_HEADER: "alice"}
+            before = await client.get("/Student/Entry.aspx?s=564001", headers=headers)
+            assert "Status: Submitted" in await before.text()
+
+            diff = await reload_model(app, load_model(_edit(dataset, path, "564002", status="locked")))
+            assert diff.changed == {"564002"}
+
+            kept = await client.get("/Student/Entry.aspx?s=564001", headers=headers)
+            assert "Status: Submitted" in await kept.text()
+            edited = await client.get("/Student/Entry.aspx?s=564002", headers=headers)
+            assert "Status: Closed" in await edited.text()
+
+    asyncio.run(run())